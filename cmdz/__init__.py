@@ -5,13 +5,14 @@
 "write your own commands"
 
 
-from cmdz import bus, event, handler, object, run, thread
+from cmdz import bus, event, handler, loop, object, run, store, thread
 
 
 from cmdz.bus import *
 from cmdz.object import *
 from cmdz.event import *
 from cmdz.handler import *
+from cmdz.loop import *
 from cmdz.run import *
 from cmdz.thread import *
 
@@ -7,6 +7,7 @@
 
 import threading
 import time
+import _thread
 
 
 from .bus import Bus
@@ -16,20 +17,44 @@ from .thread import elapsed
 
 def __dir__():
     return  (
+             "Events",
              "Parsed",
              "Event",
             )
 
 
+readylock = _thread.allocate_lock()
+
+
+class Lazy:
+
+    """a Default() that is only created when it is first used.
+
+    non-data descriptor, the created Default is stored in the instance
+    __dict__ which then takes precedence over the descriptor.
+
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        val = obj.__dict__[self.name] = Default()
+        return val
+
+
 class Parsed(Default):
 
+    gets = Lazy()
+    sets = Lazy()
+    toskip = Lazy()
+
     def __init__(self):
         Default.__init__(self)
         self.args = []
-        self.gets = Default()
         self.isparsed = False
-        self.sets = Default()
-        self.toskip = Default()
         self.txt = ""
 
     def parse(self, txt=None):
@@ -75,10 +100,12 @@ class Parsed(Default):
 
 class Event(Parsed):
 
+    __slots__ = ("__done__", "__ready__", "__thr__")
 
     def __init__(self):
         Parsed.__init__(self)
-        self.__ready__ = threading.Event()
+        self.__done__ = False
+        self.__ready__ = None
         self.__thr__ = None
         self.control = "!"
         self.createtime = time.time()
@@ -101,7 +128,11 @@ class Event(Parsed):
         Bus.say(self.orig, self.channel, txt)
 
     def ready(self):
-        self.__ready__.set()
+        with readylock:
+            self.__done__ = True
+            sig = self.__ready__
+        if sig:
+            sig.set()
 
     def reply(self, txt):
         self.result.append(txt)
@@ -113,4 +144,54 @@ class Event(Parsed):
     def wait(self):
         if self.__thr__:
             self.__thr__.join()
-        self.__ready__.wait()
+        with readylock:
+            if self.__done__:
+                return
+            if not self.__ready__:
+                self.__ready__ = threading.Event()
+            sig = self.__ready__
+        sig.wait()
+
+
+class Events:
+
+    """free list of events, off unless size is set.
+
+    handlers with recycle set give their events back once the callback
+    is done, IRC.promote takes them from here instead of allocating.
+
+    """
+
+    free = {}
+    lock = _thread.allocate_lock()
+    size = 0
+
+    @staticmethod
+    def get(cls=Event):
+        with Events.lock:
+            free = Events.free.get(cls)
+            if free:
+                return free.pop()
+        return cls()
+
+    @staticmethod
+    def put(evt):
+        cls = type(evt)
+        if len(Events.free.get(cls, ())) >= Events.size or "__exc__" in evt:
+            return False
+        sig = evt.__ready__
+        evt.__dict__.clear()
+        try:
+            del evt.__fnm__
+        except AttributeError:
+            pass
+        cls.__init__(evt)
+        if sig:
+            sig.clear()
+            evt.__ready__ = sig
+        with Events.lock:
+            free = Events.free.setdefault(cls, [])
+            if len(free) >= Events.size:
+                return False
+            free.append(evt)
+        return True
@@ -5,14 +5,18 @@
 "handler"
 
 
+import asyncio
 import inspect
 import queue
 import sys
 import threading
 import time
+import _thread
 
 
 from .bus import Bus
+from .event import Events
+from .loop import Loop
 from .object import Object
 from .thread import launch
 
@@ -31,8 +35,12 @@ __all__ = __dir__()
 
 class Callback(Object):
 
-    cbs = Object()
     errors = []
+    recycle = False
+
+    def __init__(self):
+        Object.__init__(self)
+        self.cbs = Object()
 
     def register(self, typ, cbs):
         if typ not in self.cbs:
@@ -42,9 +50,22 @@ class Callback(Object):
         func = getattr(self.cbs, event.type, None)
         if not func:
             event.ready()
+            if self.recycle:
+                Events.put(event)
+            return
+        if self.recycle:
+            launch(self.recycled, func, event)
             return
         event.__thr__ = launch(func, event)
 
+    @staticmethod
+    def recycled(func, event):
+        try:
+            func(event)
+        finally:
+            event.ready()
+            Events.put(event)
+
     def dispatch(self, event):
         self.callback(event)
 
@@ -90,8 +111,20 @@ class Command(Object):
 
 class Handler(Callback):
 
+    """event queue with a consumer loop.
+
+    in async mode (Loop.enabled) events are consumed on the loop from an
+    asyncio.Queue: put() feeds it directly when poll() is the plain queue
+    get, a handler with its own blocking poll() gets a dedicated thread
+    that pumps poll() results into it, so no handler pins a thread of the
+    loop's default executor.
+
+    """
+
     def __init__(self):
         Callback.__init__(self)
+        self.aqueue = None
+        self.plock = _thread.allocate_lock()
         self.queue = queue.Queue()
         self.stopped = threading.Event()
         self.stopped.clear()
@@ -102,21 +135,55 @@ class Handler(Callback):
     def add(cmd):
         Command.add(cmd)
 
+    async def aloop(self):
+        while not self.stopped.is_set():
+            evt = await self.apoll()
+            if self.stopped.is_set():
+                break
+            if evt is not None:
+                self.handle(evt)
+
     def announce(self, txt):
         self.raw(txt)
 
+    async def apoll(self):
+        if self.aqueue is None:
+            with self.plock:
+                self.aqueue = asyncio.Queue()
+                if type(self).poll is Handler.poll:
+                    while not self.queue.empty():
+                        self.aqueue.put_nowait(self.queue.get_nowait())
+                else:
+                    launch(self.pump, asyncio.get_running_loop(), self.aqueue, pooled=False)
+        return await self.aqueue.get()
+
     def handle(self, event):
         self.dispatch(event)
 
     def loop(self):
-        while not self.stopped.set():
-            self.handle(self.poll())
+        while not self.stopped.is_set():
+            evt = self.poll()
+            if self.stopped.is_set():
+                break
+            if evt is not None:
+                self.handle(evt)
 
     def poll(self):
         return self.queue.get()
 
+    def pump(self, loop, aqueue):
+        while not self.stopped.is_set():
+            evt = self.poll()
+            loop.call_soon_threadsafe(aqueue.put_nowait, evt)
+            if evt is None:
+                break
+
     def put(self, event):
-        self.queue.put_nowait(event)
+        with self.plock:
+            if self.aqueue is not None and type(self).poll is Handler.poll:
+                Loop.call(self.aqueue.put_nowait, event)
+                return
+            self.queue.put_nowait(event)
 
     def raw(self, txt):
         raise NotImplementedError("raw")
@@ -130,10 +197,18 @@ class Handler(Callback):
 
     def stop(self):
         self.stopped.set()
+        with self.plock:
+            if self.aqueue is not None:
+                Loop.call(self.aqueue.put_nowait, None)
+                return
+            self.queue.put_nowait(None)
 
     def start(self):
         self.stopped.clear()
-        self.loop()
+        self.aqueue = None
+        if Loop.enabled:
+            return Loop.submit(self.aloop())
+        return self.loop()
 
     def wait(self):
         while 1:
@@ -0,0 +1,85 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116,R0903
+
+
+"asyncio runtime"
+
+
+import asyncio
+import threading
+import _thread
+
+
+def __dir__():
+    return (
+            'Loop',
+           )
+
+
+__all__ = __dir__()
+
+
+class Loop:
+
+    """one asyncio event loop running in a thread of its own.
+
+    when enabled (loop=async on the command line) handlers, irc bots,
+    the udp relay and timers run as coroutines on this loop instead of
+    holding a blocking thread each.
+
+    """
+
+    enabled = False
+    lock = _thread.allocate_lock()
+    loop = None
+    thread = None
+
+    @staticmethod
+    def call(func, *args):
+        return Loop.get().call_soon_threadsafe(func, *args)
+
+    @staticmethod
+    async def delay(sleep, func, *args):
+        await asyncio.sleep(sleep)
+        func(*args)
+
+    @staticmethod
+    def enable():
+        Loop.enabled = True
+        return Loop.get()
+
+    @staticmethod
+    def get():
+        with Loop.lock:
+            if not Loop.loop or Loop.loop.is_closed():
+                Loop.loop = asyncio.new_event_loop()
+                Loop.thread = threading.Thread(
+                                               target=Loop.run,
+                                               args=(Loop.loop,),
+                                               name="loop",
+                                               daemon=True
+                                              )
+                Loop.thread.start()
+        return Loop.loop
+
+    @staticmethod
+    def later(sleep, func, *args):
+        return Loop.submit(Loop.delay(sleep, func, *args))
+
+    @staticmethod
+    def run(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    @staticmethod
+    def stop():
+        with Loop.lock:
+            loop = Loop.loop
+            Loop.enabled = False
+            Loop.loop = None
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(loop.stop)
+
+    @staticmethod
+    def submit(coro):
+        return asyncio.run_coroutine_threadsafe(coro, Loop.get())
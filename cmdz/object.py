@@ -47,33 +47,51 @@ great for giving objects peristence by having their state stored in files.
 """
 
 
+import collections
 import datetime
+import heapq
 import inspect
 import json
+import lzma
+import marshal
 import os
 import pathlib
+import threading
 import time
 import uuid
+import zlib
 import _thread
 
 
+from .store import backends, disklock
+
+
 def __dir__():
     return (
+            'Batch',
+            'Cache',
             'Class',
             'Db',
             'Default',
+            'Index',
             'Object',
             'ObjectDecoder',
             'ObjectEncoder',
             'Wd',
+            'batch',
             'cdir',
+            'compact',
+            'decode',
             'dump',
             'dumps',
             'edit',
+            'encode',
+            'explain',
             'find',
             'fns',
             'fntime',
             'hook',
+            'ifind',
             'items',
             'keys',
             'kind',
@@ -82,9 +100,11 @@ def __dir__():
             'loads',
             'locked',
             'match',
+            'planstats',
             'printable',
             'register',
             'save',
+            'save_many',
             'scan',
             'spl',
             'update',
@@ -118,7 +138,10 @@ def locked(lock):
     return lockeddec
 
 
-disklock = _thread.allocate_lock()
+cachelock = _thread.allocate_lock()
+
+
+MARSHAL = b"MRS1"
 
 
 class Object:
@@ -129,11 +152,6 @@ class Object:
 
     def __init__(self, *args, **kwargs):
         object.__init__(self)
-        self.__fnm__ = os.path.join(
-            kind(self),
-            str(uuid.uuid4().hex),
-            os.sep.join(str(datetime.datetime.now()).split()),
-        )
         if args:
             val = args[0]
             if isinstance(val, list):
@@ -166,6 +184,45 @@ class Object:
         self.__dict__.__setitem__(key, value)
 
 
+def ident(obj):
+    return os.path.join(
+        kind(obj),
+        str(uuid.uuid4().hex),
+        os.sep.join(str(datetime.datetime.now()).split()),
+    )
+
+
+class Fnm:
+
+    """__fnm__ is only generated when it is first used.
+
+    wraps the __fnm__ slot, most Objects (parsed commands, events,
+    search selectors) are never saved and never need a path.
+
+    """
+
+    slot = Object.__fnm__
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return Fnm.slot.__get__(obj, objtype)
+        except AttributeError:
+            fnm = ident(obj)
+            Fnm.slot.__set__(obj, fnm)
+            return fnm
+
+    def __set__(self, obj, value):
+        Fnm.slot.__set__(obj, value)
+
+    def __delete__(self, obj):
+        Fnm.slot.__delete__(obj)
+
+
+Object.__fnm__ = Fnm()
+
+
 class Default(Object):
 
     __slots__ = ("__default__",)
@@ -295,13 +352,10 @@ class ObjectEncoder(json.JSONEncoder):
 
 
 
-@locked(disklock)
 def dump(obj, opath):
-    cdir(opath)
-    with open(opath, "w", encoding="utf-8") as ofile:
-        json.dump(
-            obj.__dict__, ofile, cls=ObjectEncoder, indent=4, sort_keys=True
-        )
+    fnm = os.sep.join(opath.split(os.sep)[-4:])
+    Wd.store().write(fnm, encode(obj))
+    Cache.remove(fnm)
     return opath
 
 
@@ -309,15 +363,50 @@ def dumps(obj):
     return json.dumps(obj, cls=ObjectEncoder)
 
 
-@locked(disklock)
+def decode(data):
+    if data[:4] == MARSHAL:
+        return marshal.loads(data[4:])
+    if data[:6] == b"\xfd7zXZ\x00":
+        data = lzma.decompress(data)
+    elif data[:1] == b"\x78":
+        data = zlib.decompress(data)
+    return json.loads(data)
+
+
+def encode(obj):
+    fmt = Wd.format
+    if fmt == "marshal":
+        try:
+            return MARSHAL + marshal.dumps(obj.__dict__)
+        except ValueError:
+            fmt = "compact"
+    if fmt == "json":
+        data = json.dumps(obj.__dict__, cls=ObjectEncoder, indent=4, sort_keys=True)
+        return bytes(data, "utf-8")
+    data = bytes(
+                 json.dumps(obj.__dict__, cls=ObjectEncoder, separators=(",", ":")),
+                 "utf-8"
+                )
+    if fmt == "zlib":
+        return zlib.compress(data)
+    if fmt == "lzma":
+        return lzma.compress(data)
+    return data
+
+
 def load(obj, opath):
     splitted = opath.split(os.sep)
     fnm = os.sep.join(splitted[-4:])
-    lpath = os.path.join(Wd.workdir, "store", fnm)
-    if os.path.exists(lpath):
-        with open(lpath, "r", encoding="utf-8") as ofile:
-            res = json.load(ofile, cls=ObjectDecoder)
-            update(obj, res)
+    res = Cache.get(fnm)
+    if res is None:
+        gen = Cache.generation(fnm)
+        data = Wd.store().read(fnm)
+        if data:
+            res = decode(data)
+            Cache.put(fnm, res, len(data), gen)
+            res = copy(res)
+    if res is not None:
+        update(obj, res)
     obj.__fnm__ = fnm
 
 
@@ -328,32 +417,377 @@ def loads(jss):
 def save(obj):
     prv = os.sep.join(obj.__fnm__.split(os.sep)[:2])
     obj.__fnm__ = os.path.join(prv, os.sep.join(str(datetime.datetime.now()).split()))
+    if Batch.active() or Wd.store().indexed:
+        with batch():
+            Batch.add(obj)
+        return obj.__fnm__
     opath = Wd.getpath(obj.__fnm__)
     dump(obj, opath)
+    Index.add(obj.__fnm__, obj)
     return obj.__fnm__
 
 
-@locked(disklock)
+def save_many(objs):
+    with batch():
+        for obj in objs:
+            save(obj)
+    return [obj.__fnm__ for obj in objs]
+
+
 def write(obj):
     opath = Wd.getpath(obj.__fnm__)
-    cdir(opath)
-    with open(opath, "w", encoding="utf-8") as ofile:
-        json.dump(
-            obj.__dict__, ofile, cls=ObjectEncoder, indent=4, sort_keys=True
-        )
+    if Batch.active() or Wd.store().indexed:
+        with batch():
+            Batch.add(obj)
+        return opath
+    dump(obj, opath)
+    Index.add(obj.__fnm__, obj)
     return opath
 
 
+class Batch:
+
+    """group saves into one write per backend.
+
+    inside a with batch(): block save() and write() only encode the object,
+    the collected revisions are handed to the backend in one go when the
+    outermost block exits (or every Batch.size revisions), so directories
+    get created once, index files are appended once per type and the log
+    and sqlite backends commit once, sqlite writes the revisions and their
+    latest entries in the same transaction. revisions saved in a batch are not
+    visible to find() until the batch is flushed.
+
+    """
+
+    local = threading.local()
+    size = 1000
+
+    def __enter__(self):
+        Batch.local.depth = getattr(Batch.local, "depth", 0) + 1
+        if Batch.local.depth == 1:
+            Batch.local.records = []
+        return self
+
+    def __exit__(self, *args):
+        Batch.local.depth -= 1
+        if not Batch.local.depth:
+            Batch.flush()
+
+    @staticmethod
+    def active():
+        return getattr(Batch.local, "depth", 0) > 0
+
+    @staticmethod
+    def add(obj):
+        otp = obj.__fnm__.split(os.sep)[0]
+        Batch.local.records.append((obj.__fnm__, encode(obj), Index.fields(otp, obj)))
+        if len(Batch.local.records) >= Batch.size:
+            Batch.flush()
+
+    @staticmethod
+    def flush():
+        records = Batch.local.records
+        Batch.local.records = []
+        if not records:
+            return
+        store = Wd.store()
+        entries = {}
+        for fnm, _data, flds in records:
+            entries.setdefault(fnm.split(os.sep)[0], []).append((fntime(fnm), fnm, flds))
+        if store.indexed:
+            store.write_many(
+                             [(fnm, data) for fnm, data, _flds in records],
+                             [ent for ents in entries.values() for ent in ents]
+                            )
+        else:
+            store.write_many([(fnm, data) for fnm, data, _flds in records])
+        for fnm, _data, _flds in records:
+            Cache.remove(fnm)
+        if store.indexed:
+            return
+        for otp, ents in entries.items():
+            Index.extend(otp, ents)
+
+
+def batch():
+    return Batch()
+
+
+class Cache:
+
+    """lru cache of decoded revisions.
+
+    revisions are write once so the path (together with the workdir and
+    backend it was read from) is a safe key, callers get a copy of the
+    cached data so objects can be changed and saved again. the cache is
+    bounded both in number of entries and in (on disk) size.
+
+    remove() bumps a generation counter (striped over the keys), put()
+    drops data read before a remove of the same key happened.
+
+    """
+
+    evictions = 0
+    gens = [0] * 64
+    hits = 0
+    limit = 10000
+    maxsize = 64 * 1024 * 1024
+    misses = 0
+    objs = collections.OrderedDict()
+    size = 0
+
+    @staticmethod
+    def clear():
+        with cachelock:
+            Cache.objs.clear()
+            Cache.size = 0
+
+    @staticmethod
+    def generation(fnm):
+        return Cache.gens[hash(Cache.key(fnm)) % len(Cache.gens)]
+
+    @staticmethod
+    def get(fnm):
+        key = Cache.key(fnm)
+        with cachelock:
+            try:
+                data, _size = Cache.objs[key]
+            except KeyError:
+                Cache.misses += 1
+                return None
+            Cache.objs.move_to_end(key)
+            Cache.hits += 1
+        return copy(data)
+
+    @staticmethod
+    def key(fnm):
+        return (Wd.get(), Wd.backend, fnm)
+
+    @staticmethod
+    def put(fnm, data, size, gen=None):
+        if not Cache.limit or size > Cache.maxsize:
+            return
+        key = Cache.key(fnm)
+        with cachelock:
+            if gen is not None and Cache.gens[hash(key) % len(Cache.gens)] != gen:
+                return
+            if key in Cache.objs:
+                Cache.size -= Cache.objs.pop(key)[1]
+            Cache.objs[key] = (data, size)
+            Cache.size += size
+            while len(Cache.objs) > Cache.limit or Cache.size > Cache.maxsize:
+                _fnm, (_data, size) = Cache.objs.popitem(last=False)
+                Cache.size -= size
+                Cache.evictions += 1
+
+    @staticmethod
+    def remove(fnm):
+        key = Cache.key(fnm)
+        with cachelock:
+            Cache.gens[hash(key) % len(Cache.gens)] += 1
+            if key in Cache.objs:
+                Cache.size -= Cache.objs.pop(key)[1]
+
+    @staticmethod
+    def resize(limit, maxsize=None):
+        Cache.limit = limit
+        if maxsize is not None:
+            Cache.maxsize = maxsize
+        with cachelock:
+            while Cache.objs and (
+                                  len(Cache.objs) > Cache.limit
+                                  or Cache.size > Cache.maxsize
+                                 ):
+                _fnm, (_data, size) = Cache.objs.popitem(last=False)
+                Cache.size -= size
+                Cache.evictions += 1
+
+    @staticmethod
+    def stats():
+        return Object({
+                       "entries": len(Cache.objs),
+                       "evictions": Cache.evictions,
+                       "hits": Cache.hits,
+                       "limit": Cache.limit,
+                       "maxsize": Cache.maxsize,
+                       "misses": Cache.misses,
+                       "size": Cache.size
+                      })
+
+
+class Index:
+
+    """per type index of the latest revision of every object.
+
+    the index of a type is an append only file in the workdir's index
+    directory, one json [time, fnm, fields] line per saved revision, later
+    lines override earlier ones for the same uuid. files are read
+    incrementally, only lines appended since the previous read get parsed,
+    so other processes writing into the same store are picked up as well.
+
+    fields holds the string value of the fields a class is registered with
+    (Class.add(clz, index="field,field")) and the deleted flag, it is None
+    when the revision was indexed without looking at its content.
+
+    """
+
+    cache = {}
+
+    @staticmethod
+    def add(fnm, obj=None):
+        otp = fnm.split(os.sep)[0]
+        Index.extend(otp, [(fntime(fnm), fnm, Index.fields(otp, obj))])
+
+    @staticmethod
+    def extend(otp, entries):
+        if Wd.store().indexed:
+            Wd.store().index(entries)
+            return
+        with disklock(otp):
+            ent = Index.read(otp)
+            lines = []
+            for entry in entries:
+                if ent[3].get(entry[1].split(os.sep)[1]) != entry:
+                    lines.append(json.dumps(entry) + "\n")
+            if not lines:
+                return
+            ipath = Index.path(otp)
+            cdir(ipath)
+            with open(ipath, "a", encoding="utf-8") as ifile:
+                ifile.write("".join(lines))
+            ent = Index.read(otp)
+            if ent[2] > 2 * len(ent[3]) + 100:
+                Index.dump(otp, ent[3])
+
+    @staticmethod
+    def dump(otp, entries, store=None):
+        store = store or Wd.store()
+        if store.indexed:
+            store.reindex(otp, entries)
+            return
+        ipath = Index.path(otp, store)
+        cdir(ipath)
+        tmp = "%s.%s.tmp" % (ipath, os.getpid())
+        with open(tmp, "w", encoding="utf-8") as ifile:
+            for entry in sorted(entries.values(), key=lambda x: x[:2]):
+                ifile.write(json.dumps(entry) + "\n")
+        os.replace(tmp, ipath)
+        stat = os.stat(ipath)
+        Index.cache[ipath] = [stat.st_ino, stat.st_size, len(entries), dict(entries)]
+
+    @staticmethod
+    def fields(otp, obj):
+        if obj is None:
+            return None
+        res = {}
+        for key in Class.fields(otp):
+            try:
+                res[key] = str(getattr(obj, key))
+            except AttributeError:
+                res[key] = None
+        if getattr(obj, "__deleted__", False):
+            res["__deleted__"] = True
+        return res
+
+    @staticmethod
+    def get(otp):
+        if Wd.store().indexed:
+            return Wd.store().entries(otp)
+        with disklock(otp):
+            return dict(Index.read(otp)[3])
+
+    @staticmethod
+    def path(otp, store=None):
+        return os.path.join((store or Wd.store()).root, "index", otp)
+
+    @staticmethod
+    def read(otp):
+        ipath = Index.path(otp)
+        try:
+            stat = os.stat(ipath)
+        except FileNotFoundError:
+            if not Wd.store().exists(otp):
+                return [None, 0, 0, {}]
+            Index.dump(otp, Index.scan(otp))
+            stat = os.stat(ipath)
+        ent = Index.cache.get(ipath)
+        if not ent or ent[0] != stat.st_ino or stat.st_size < ent[1]:
+            ent = [stat.st_ino, 0, 0, {}]
+            Index.cache[ipath] = ent
+        if stat.st_size > ent[1]:
+            with open(ipath, "rb") as ifile:
+                ifile.seek(ent[1])
+                data = ifile.read(stat.st_size - ent[1])
+            data = data[:data.rfind(b"\n")+1]
+            for line in data.splitlines():
+                try:
+                    tme, fnm, *flds = json.loads(line)
+                except ValueError:
+                    continue
+                ent[3][fnm.split(os.sep)[1]] = (tme, fnm, flds[0] if flds else None)
+                ent[2] += 1
+            ent[1] += len(data)
+        return ent
+
+    @staticmethod
+    def remove(otp, uids):
+        if Wd.store().indexed:
+            return
+        with disklock(otp):
+            ent = Index.read(otp)
+            Index.dump(otp, {x: y for x, y in ent[3].items() if x not in uids})
+
+    @staticmethod
+    def rebuild(otp, store=None):
+        "store is the backend to index, the current one (Wd.store()) if not given"
+        with disklock(otp):
+            Index.dump(otp, Index.scan(otp, store), store)
+
+    @staticmethod
+    def scan(otp, store=None):
+        res = {}
+        for uid, fnm in (store or Wd.store()).scan(otp).items():
+            obj = None
+            if Class.fields(otp) and store:
+                obj = (Class.get(otp) or Object)()
+                update(obj, decode(store.read(fnm)))
+            elif Class.fields(otp):
+                obj = hook(Wd.getpath(fnm))
+            res[uid] = (fntime(fnm), fnm, Index.fields(otp, obj))
+        return res
+
+    @staticmethod
+    def types():
+        if Wd.store().indexed:
+            return sorted(Wd.store().types())
+        path = os.path.join(Wd.store().root, "index")
+        if not os.path.exists(path):
+            return []
+        return sorted([x for x in os.listdir(path) if not x.endswith(".tmp")])
+
+    @staticmethod
+    def verify(otp):
+        old = Index.get(otp)
+        new = Index.scan(otp)
+        res = []
+        for uid in sorted(set(old) | set(new)):
+            if (old.get(uid) or ())[:2] != (new.get(uid) or ())[:2]:
+                res.append(uid)
+        return res
+
+
 class Db:
 
     @staticmethod
-    def find(otp, selector=None, index=None, timed=None, deleted=True):
+    def find(otp, selector=None, index=None, timed=None, deleted=True, stats=None):
         if selector is None:
             selector = {}
         nmr = -1
         res = []
-        for fnm in fns(otp, timed):
+        for _tme, fnm, _certain in Db.plan(otp, selector, timed, deleted, stats):
             obj = hook(fnm)
+            if stats is not None:
+                stats.read += 1
             if deleted and "__deleted__" in obj and obj.__deleted__:
                 continue
             if selector and not search(obj, selector):
@@ -362,15 +796,118 @@ class Db:
             if index is not None and nmr != index:
                 continue
             res.append(obj)
+        if stats is not None:
+            stats.matched += len(res)
         return res
 
     @staticmethod
     def last(otp, selector=None, index=None, timed=None):
-        res =  sorted(Db.find(otp, selector, index, timed), key=lambda x: fntime(x.__fnm__))
+        res = Db.find(otp, selector, index, timed)
         if res:
             return res[-1]
         return None
 
+    @staticmethod
+    def plan(otp, selector=None, timed=None, deleted=True, stats=None):
+        fields = Class.fields(otp)
+        selected = [key for key, _value in items(selector or {})]
+        indexed = bool(selected) and all(key in fields for key in selected)
+        res = []
+        nmr = 0
+        for tme, fnm, flds in entries(otp, timed):
+            nmr += 1
+            if flds is not None:
+                if deleted and flds.get("__deleted__"):
+                    continue
+                if indexed and not Db.prefilter(flds, selector):
+                    continue
+            certain = flds is not None and (not selected or indexed and Db.exact(flds, selector))
+            res.append((tme, Wd.getpath(fnm), certain))
+        if stats is not None:
+            stats.plan = " ".join([x for x in (stats.plan, "index" if indexed else "scan") if x])
+            stats.files += nmr
+            stats.candidates += len(res)
+        return res
+
+    @staticmethod
+    def exact(flds, selector):
+        for key, _value in items(selector):
+            if key not in flds:
+                return False
+        return True
+
+    @staticmethod
+    def prefilter(flds, selector):
+        for key, value in items(selector):
+            if key not in flds:
+                return True
+            if flds[key] is not None and str(value) in flds[key]:
+                return True
+        return False
+
+
+def compact(otp, keep=1, cutoff=None, grace=None):
+    latest = Index.get(otp)
+    revs = {}
+    for fnm in Wd.store().revisions(otp):
+        revs.setdefault(fnm.split(os.sep)[1], []).append(fnm)
+    drop = []
+    purged = []
+    for uid, fnms in revs.items():
+        fnms.sort(key=fntime)
+        entry = latest.get(uid)
+        if (
+            grace is not None
+            and entry
+            and entry[0] < time.time() - grace
+            and isdeleted(entry)
+           ):
+            drop.extend(fnms)
+            purged.append(uid)
+            continue
+        for fnm in fnms[:-max(keep, 1)]:
+            if cutoff is not None and fntime(fnm) >= cutoff:
+                continue
+            if entry and fnm == entry[1]:
+                continue
+            drop.append(fnm)
+    if purged:
+        Index.remove(otp, purged)
+    if drop:
+        Wd.store().remove(otp, drop)
+    for fnm in drop:
+        Cache.remove(fnm)
+    return len(drop), len(purged)
+
+
+def isdeleted(entry):
+    if entry[2] is not None:
+        return bool(entry[2].get("__deleted__"))
+    return bool(getattr(hook(Wd.getpath(entry[1])), "__deleted__", False))
+
+
+def entries(otp, timed=None):
+    res = []
+    for entry in Index.get(otp).values():
+        if (
+            timed
+            and "from" in timed
+            and timed["from"]
+            and entry[0] < timed["from"]
+        ):
+            continue
+        if timed and timed.to and entry[0] > timed.to:
+            continue
+        res.append(entry)
+    return sorted(res, key=lambda x: x[:2])
+
+
+def explain(otp, selector=None, timed=None, deleted=True):
+    stats = planstats()
+    find(otp, selector, None, timed, deleted, stats)
+    return stats
+
+
 def fnclass(path):
     pth = []
     try:
@@ -386,30 +923,45 @@ def fns(otp, timed=None):
     if not otp:
         return []
     assert Wd.workdir
-    path = os.path.join(Wd.workdir, "store", otp) + os.sep
-    res = []
-    dname = ""
-    for rootdir, dirs, _files in os.walk(path, topdown=False):
-        if dirs:
-            dname = sorted(dirs)[-1]
-            if dname.count("-") == 2:
-                ddd = os.path.join(rootdir, dname)
-                fls = sorted(os.listdir(ddd))
-                if fls:
-                    path2 = os.path.join(ddd, fls[-1])
-                    if (
-                        timed
-                        and "from" in timed
-                        and timed["from"]
-                        and fntime(path2) < timed["from"]
-                    ):
-                        continue
-                    if timed and timed.to and fntime(path2) > timed.to:
-                        continue
-                    res.append(path2)
-    return sorted(res, key=lambda x: fntime(x))
+    return [Wd.getpath(x[1]) for x in entries(otp, timed)]
+
 
 def fntime(daystr):
+    try:
+        datestr, timestr = daystr[-26:].split(os.sep)
+        hours = timestr[:2]
+        if datestr[4] != "-" or timestr[2] != ":" or timestr[8] != ".":
+            raise ValueError(daystr)
+        key = datestr + hours
+        base = hourcache.get(key)
+        if base is None:
+            if len(hourcache) > 100000:
+                hourcache.clear()
+            base = time.mktime((
+                                int(datestr[:4]),
+                                int(datestr[5:7]),
+                                int(datestr[8:10]),
+                                int(hours),
+                                0,
+                                0,
+                                0,
+                                0,
+                                -1
+                               ))
+            if time.localtime(base - 3600).tm_isdst != time.localtime(base + 7200).tm_isdst:
+                base = False
+            hourcache[key] = base
+        if base is False:
+            return fnparse(daystr)
+        return base + int(timestr[3:5]) * 60 + int(timestr[6:8]) + float(timestr[8:])
+    except (IndexError, ValueError, OverflowError):
+        return fnparse(daystr)
+
+
+hourcache = {}
+
+
+def fnparse(daystr):
     daystr = daystr.replace("_", ":")
     datestr = " ".join(daystr.split(os.sep)[-2:])
     if "." in datestr:
@@ -435,17 +987,45 @@ def hook(path):
     return obj
 
 
-def find(otp, selector=None, index=None, timed=None, deleted=True):
+def find(otp, selector=None, index=None, timed=None, deleted=True, stats=None):
     names = Class.full(otp)
     if not names:
         names = Wd.types(otp)
     result = []
     for nme in names:
-        res = Db.find(nme, selector, index, timed, deleted)
+        res = Db.find(nme, selector, index, timed, deleted, stats)
         result.extend(res)
     return sorted(result, key=lambda x: fntime(x.__fnm__))
 
 
+def ifind(otp, selector=None, timed=None, deleted=True, limit=None, offset=0, stats=None):
+    names = Class.full(otp)
+    if not names:
+        names = Wd.types(otp)
+    plans = [Db.plan(nme, selector, timed, deleted, stats) for nme in names]
+    nmr = 0
+    for _tme, fnm, certain in heapq.merge(*plans):
+        if limit is not None and nmr >= limit:
+            break
+        if offset and certain:
+            offset -= 1
+            continue
+        obj = hook(fnm)
+        if stats is not None:
+            stats.read += 1
+        if deleted and "__deleted__" in obj and obj.__deleted__:
+            continue
+        if selector and not search(obj, selector):
+            continue
+        if stats is not None:
+            stats.matched += 1
+        if offset:
+            offset -= 1
+            continue
+        nmr += 1
+        yield obj
+
+
 def last(obj, selector=None):
     if selector is None:
         selector = {}
@@ -465,6 +1045,16 @@ def match(otp, selector=None):
     return None
 
 
+def planstats():
+    stats = Object()
+    stats.plan = ""
+    stats.files = 0
+    stats.candidates = 0
+    stats.read = 0
+    stats.matched = 0
+    return stats
+
+
 def search(obj, selector):
     res = False
     select = Object(selector)
@@ -482,15 +1072,22 @@ def search(obj, selector):
 class Class:
 
     cls = {}
+    idx = {}
 
     @staticmethod
-    def add(clz):
+    def add(clz, index=None):
         Class.cls["%s.%s" % (clz.__module__, clz.__name__)] =  clz
+        if index:
+            Class.idx["%s.%s" % (clz.__module__, clz.__name__)] = spl(index)
 
     @staticmethod
     def all():
         return Class.cls.keys()
 
+    @staticmethod
+    def fields(oname):
+        return Class.idx.get(oname, [])
+
     @staticmethod
     def full(oname):
         nme = oname.lower()
@@ -511,6 +1108,9 @@ class Class:
 
 class Wd:
 
+    backend = "files"
+    format = "json"
+    stores = {}
     workdir = ""
 
     @staticmethod
@@ -530,6 +1130,13 @@ class Wd:
     def set(path):
         Wd.workdir = path
 
+    @staticmethod
+    def store():
+        key = (Wd.backend, Wd.get())
+        if key not in Wd.stores:
+            Wd.stores[key] = backends[Wd.backend](Wd.get())
+        return Wd.stores[key]
+
     @staticmethod
     def storedir():
         sdr =  os.path.join(Wd.get(), "store", '')
@@ -538,9 +1145,8 @@ class Wd:
 
     @staticmethod
     def types(oname=None):
-        sdr = Wd.storedir()
         res = []
-        for fnm in os.listdir(sdr):
+        for fnm in Wd.store().types():
             if oname and oname.lower() not in fnm.split(".")[-1].lower():
                 continue
             if fnm not in res:
@@ -548,6 +1154,14 @@ class Wd:
         return res
 
 
+def copy(data):
+    if isinstance(data, dict):
+        return {key: copy(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [copy(value) for value in data]
+    return data
+
+
 def cdir(path):
     if not os.path.isdir(path):
         path = os.path.dirname(path)
@@ -17,10 +17,12 @@ import time
 import traceback
 
 
-from .event import Event, Parsed
+from .event import Event, Events, Lazy, Parsed
 from .handler import Handler, Command, scan
-from .object import Default, last, spl, update
-from .thread import launch
+from .loop import Loop
+from .object import Cache, Default, Wd, last, spl, update
+from .store import backends
+from .thread import Pool, launch
 
 
 def __dir__():
@@ -36,6 +38,7 @@ def __dir__():
             "initer",
             "parse",
             "print_exc",
+            "remote",
             "setcompleter",
             "Scandir",
             "wait",
@@ -45,7 +48,9 @@ def __dir__():
 
 class Config(Default):
 
-    pass
+    gets = Lazy()
+    sets = Lazy()
+    toskip = Lazy()
 
 
 Cfg = Config()
@@ -101,6 +106,14 @@ class Completer(rlcompleter.Completer):
 
 
 def boot(txt):
+    prs = Parsed()
+    prs.parse(txt)
+    if prs.sets.store:
+        if prs.sets.store not in backends:
+            raise SystemExit("store=%s is not a backend, use store=<%s>" % (prs.sets.store, "|".join(backends)))
+        Wd.backend = prs.sets.store
+    if prs.sets.format:
+        Wd.format = prs.sets.format
     last(Cfg)
     parse(txt)
     if "c" in Cfg.opts:
@@ -113,6 +126,17 @@ def boot(txt):
         Cfg.wait = True
     if "x" in Cfg.opts:
         Cfg.exec = True
+    if Cfg.sets.loop in ("async", "asyncio"):
+        Loop.enable()
+    if Cfg.sets.events:
+        Events.size = int(Cfg.sets.events)
+    if Cfg.sets.workers:
+        Pool.get().size = int(Cfg.sets.workers)
+    if Cfg.sets.cache or Cfg.sets.cachesize:
+        Cache.resize(
+                     int(Cfg.sets.cache or Cache.limit),
+                     int(Cfg.sets.cachesize or Cache.maxsize)
+                    )
 
 
 def command(cli, txt, event=None):
@@ -186,6 +210,20 @@ def print_exc(ex):
     traceback.print_exception(type(ex), ex, ex.__traceback__)
 
 
+def remote(path, fname, *args):
+    "call fname of the module file at path, for worker processes, the module is loaded (once) in the worker only"
+    mod = remote.mods.get(path)
+    if mod is None:
+        spec = importlib.util.spec_from_file_location("_remote", path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        remote.mods[path] = mod
+    return getattr(mod, fname)(*args)
+
+
+remote.mods = {}
+
+
 def scandir(path, func, mods=None):
     res = []
     if not os.path.exists(path):
@@ -0,0 +1,526 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116,R0201,W0212
+
+
+"""storage backends
+
+
+a backend stores the serialized revisions of objects, it is addressed with
+the 'type/uuid/date/time' filename of a revision and deals in bytes only.
+
+files     one file per revision in a type/uuid/date/time directory tree, the
+          default layout.
+log       append only segments per type, one record per revision with an
+          offset index next to every segment. when a segment gets full a new
+          one is started and, once enough of their bytes are superseded, the
+          sealed segments are compacted, keeping only the latest revision of
+          every uuid.
+sqlite    a sqlite database (WAL mode) with a revisions table holding every
+          revision and a latest table that takes the place of the index
+          files.
+
+select a backend with Wd.backend = "log" (store=log on the command line).
+
+"""
+
+
+import fcntl
+import json
+import os
+import sqlite3
+import threading
+import _thread
+
+
+def __dir__():
+    return (
+            'Files',
+            'Segments',
+            'Sqlite',
+            'backends',
+            'disklock',
+            'migrate'
+           )
+
+
+__all__ = __dir__()
+
+
+LATEST = (
+          "INSERT INTO latest (otp, uid, tme, fnm, flds) VALUES (?, ?, ?, ?, ?) "
+          "ON CONFLICT (otp, uid) DO UPDATE SET tme = excluded.tme, "
+          "fnm = excluded.fnm, flds = excluded.flds "
+          "WHERE excluded.fnm >= latest.fnm"
+         )
+REVISIONS = "INSERT OR REPLACE INTO revisions (fnm, otp, uid, data) VALUES (?, ?, ?, ?)"
+
+
+disklocks = [_thread.allocate_lock() for _nr in range(64)]
+
+
+def disklock(key):
+    return disklocks[hash(key) % len(disklocks)]
+
+
+class Files:
+
+    indexed = False
+
+    def __init__(self, root):
+        self.root = root
+
+    def exists(self, otp):
+        return os.path.isdir(os.path.join(self.root, "store", otp))
+
+    def path(self, fnm):
+        return os.path.join(self.root, "store", fnm)
+
+    def read(self, fnm):
+        try:
+            with open(self.path(fnm), "rb") as ofile:
+                return ofile.read()
+        except FileNotFoundError:
+            return None
+
+    def remove(self, otp, fnms):
+        nmr = 0
+        for fnm in fnms:
+            opath = self.path(fnm)
+            try:
+                os.unlink(opath)
+                nmr += 1
+            except FileNotFoundError:
+                continue
+            for ddd in (os.path.dirname(opath), os.path.dirname(os.path.dirname(opath))):
+                try:
+                    os.rmdir(ddd)
+                except OSError:
+                    break
+        return nmr
+
+    def revisions(self, otp):
+        path = os.path.join(self.root, "store", otp)
+        res = []
+        for rootdir, _dirs, files in os.walk(path):
+            for fnm in files:
+                if fnm.endswith(".tmp"):
+                    continue
+                res.append(os.path.relpath(os.path.join(rootdir, fnm), os.path.join(self.root, "store")))
+        return sorted(res)
+
+    def scan(self, otp):
+        path = os.path.join(self.root, "store", otp) + os.sep
+        res = {}
+        for rootdir, dirs, _files in os.walk(path, topdown=False):
+            if dirs:
+                dname = sorted(dirs)[-1]
+                if dname.count("-") == 2:
+                    ddd = os.path.join(rootdir, dname)
+                    fls = sorted([x for x in os.listdir(ddd) if not x.endswith(".tmp")])
+                    if fls:
+                        uid = os.path.basename(rootdir)
+                        res[uid] = os.path.join(otp, uid, dname, fls[-1])
+        return res
+
+    def types(self):
+        path = os.path.join(self.root, "store")
+        if not os.path.exists(path):
+            return []
+        return os.listdir(path)
+
+    def write(self, fnm, data):
+        opath = self.path(fnm)
+        os.makedirs(os.path.dirname(opath), exist_ok=True)
+        tmp = "%s.%s.tmp" % (opath, os.getpid())
+        with disklock(opath):
+            with open(tmp, "wb") as ofile:
+                ofile.write(data)
+            os.replace(tmp, opath)
+
+    def write_many(self, records):
+        dirs = set()
+        for fnm, data in records:
+            opath = self.path(fnm)
+            ddd = os.path.dirname(opath)
+            if ddd not in dirs:
+                os.makedirs(ddd, exist_ok=True)
+                dirs.add(ddd)
+            tmp = "%s.%s.tmp" % (opath, os.getpid())
+            with disklock(opath):
+                with open(tmp, "wb") as ofile:
+                    ofile.write(data)
+                os.replace(tmp, opath)
+
+
+class Segments:
+
+    """append only segments per type.
+
+    writes go to the active (highest numbered) segment, when it is over
+    maxsize the next one is started two numbers up. the number in between
+    is where compaction writes the latest revisions of the sealed segments,
+    below the active segment, so compacted data does not count towards the
+    next roll over. sealed segments are only compacted when more than the
+    garbage fraction of their bytes is superseded, which keeps the bytes
+    written linear in the bytes saved.
+
+    """
+
+    garbage = 0.5
+    indexed = False
+    maxsize = 16 * 1024 * 1024
+
+    def __init__(self, root):
+        self.root = os.path.join(root, "log")
+        self.guard = _thread.allocate_lock()
+        self.locks = {}
+        self.maps = {}
+
+    def compact(self, otp, force=False):
+        with self.lock(otp):
+            fnms = self.refresh(otp)[0]
+            nrs = self.segments(otp)
+            if len(nrs) < 2:
+                return 0
+            sealed = [self.segpath(otp, nr, "seg") for nr in nrs[:-1]]
+            latest = {}
+            for fnm in fnms:
+                uid = fnm.split(os.sep)[1]
+                if fnm > latest.get(uid, ""):
+                    latest[uid] = fnm
+            keep = []
+            drop = 0
+            size = 0
+            stale = 0
+            for fnm, (spath, _off, length) in fnms.items():
+                if spath not in sealed:
+                    continue
+                size += length
+                if latest[fnm.split(os.sep)[1]] != fnm:
+                    drop += 1
+                    stale += length
+                    continue
+                keep.append(fnm)
+            if not drop and len(sealed) == 1:
+                return 0
+            if not force and stale <= size * self.garbage:
+                return 0
+            self.rewrite(otp, nrs[:-1], keep, nrs[-1] - 1)
+            return drop
+
+    def exists(self, otp):
+        return os.path.isdir(os.path.join(self.root, "store", otp))
+
+    def lock(self, otp):
+        with self.guard:
+            if otp not in self.locks:
+                self.locks[otp] = Lock(os.path.join(self.root, "store", otp))
+            return self.locks[otp]
+
+    def remove(self, otp, fnms):
+        with self.lock(otp):
+            locs = self.refresh(otp)[0]
+            drop = set(fnms) & set(locs)
+            if not drop:
+                return 0
+            self.rewrite(otp, self.segments(otp), [x for x in locs if x not in drop])
+            return len(drop)
+
+    def rewrite(self, otp, nrs, keep, newnr=None):
+        locs = self.refresh(otp)[0]
+        if newnr is None or newnr in self.segments(otp):
+            newnr = self.segments(otp)[-1] + 1
+        self.append(otp, newnr, [(fnm, self.get(locs[fnm])) for fnm in sorted(keep)], sync=True)
+        for nr in nrs:
+            os.unlink(self.segpath(otp, nr, "idx"))
+            os.unlink(self.segpath(otp, nr, "seg"))
+        self.maps.pop(otp, None)
+
+    def read(self, fnm):
+        otp = fnm.split(os.sep)[0]
+        for _nr in range(2):
+            loc = self.maps.get(otp, ({}, {}))[0].get(fnm)
+            if not loc:
+                with self.lock(otp):
+                    loc = self.refresh(otp)[0].get(fnm)
+            if not loc:
+                return None
+            try:
+                return self.get(loc)
+            except FileNotFoundError:
+                with self.lock(otp):
+                    self.maps.pop(otp, None)
+        return None
+
+    def refresh(self, otp):
+        ent = self.maps.get(otp)
+        nrs = self.segments(otp)
+        if not ent or [x for x in ent[1] if x not in nrs]:
+            ent = ({}, {})
+        fnms, sizes = ent
+        for nr in nrs:
+            ipath = self.segpath(otp, nr, "idx")
+            try:
+                size = os.path.getsize(ipath)
+            except FileNotFoundError:
+                continue
+            if size <= sizes.get(nr, 0):
+                continue
+            with open(ipath, "rb") as ifile:
+                ifile.seek(sizes.get(nr, 0))
+                data = ifile.read(size - sizes.get(nr, 0))
+            data = data[:data.rfind(b"\n")+1]
+            for line in data.decode("utf-8").splitlines():
+                fnm, off, length = line.split()
+                fnms[fnm] = (self.segpath(otp, nr, "seg"), int(off), int(length))
+            sizes[nr] = sizes.get(nr, 0) + len(data)
+        self.maps[otp] = ent
+        return ent
+
+    def revisions(self, otp):
+        with self.lock(otp):
+            return sorted(self.refresh(otp)[0])
+
+    def scan(self, otp):
+        with self.lock(otp):
+            fnms = self.refresh(otp)[0]
+        res = {}
+        for fnm in fnms:
+            uid = fnm.split(os.sep)[1]
+            if fnm > res.get(uid, ""):
+                res[uid] = fnm
+        return res
+
+    def segments(self, otp):
+        try:
+            names = os.listdir(os.path.join(self.root, "store", otp))
+        except FileNotFoundError:
+            return []
+        return sorted([int(x[:-4]) for x in names if x.endswith(".seg")])
+
+    def segpath(self, otp, nr, ext):
+        return os.path.join(self.root, "store", otp, "%08d.%s" % (nr, ext))
+
+    def types(self):
+        path = os.path.join(self.root, "store")
+        if not os.path.exists(path):
+            return []
+        return os.listdir(path)
+
+    def write(self, fnm, data):
+        self.commit([(fnm, data)])
+
+    def write_many(self, records):
+        self.commit(records, sync=True)
+
+    def commit(self, records, sync=False):
+        types = {}
+        for fnm, data in records:
+            types.setdefault(fnm.split(os.sep)[0], []).append((fnm, data))
+        for otp, recs in types.items():
+            rolled = False
+            with self.lock(otp):
+                nrs = self.segments(otp) or [1]
+                nr = nrs[-1]
+                try:
+                    if os.path.getsize(self.segpath(otp, nr, "seg")) > self.maxsize:
+                        nr += 2
+                        rolled = True
+                except FileNotFoundError:
+                    pass
+                self.append(otp, nr, recs, sync)
+            if rolled:
+                self.compact(otp)
+
+    def append(self, otp, nr, records, sync=False):
+        if not records:
+            return
+        spath = self.segpath(otp, nr, "seg")
+        chunks = []
+        lines = []
+        with open(spath, "ab") as sfile:
+            off = sfile.tell()
+            for fnm, data in records:
+                header = bytes("%s %s\n" % (fnm, len(data)), "utf-8")
+                chunks.append(header + data + b"\n")
+                lines.append("%s %s %s\n" % (fnm, off + len(header), len(data)))
+                off += len(chunks[-1])
+            sfile.write(b"".join(chunks))
+            if sync:
+                sfile.flush()
+                os.fsync(sfile.fileno())
+        with open(self.segpath(otp, nr, "idx"), "a", encoding="utf-8") as ifile:
+            ifile.write("".join(lines))
+
+    @staticmethod
+    def get(loc):
+        spath, off, length = loc
+        with open(spath, "rb") as sfile:
+            sfile.seek(off)
+            return sfile.read(length)
+
+
+class Sqlite:
+
+    indexed = True
+
+    def __init__(self, root):
+        self.root = os.path.join(root, "sqlite")
+        self.path = os.path.join(self.root, "store.db")
+        self.local = threading.local()
+
+    def db(self):
+        dbs = getattr(self.local, "dbs", None)
+        if dbs is None:
+            os.makedirs(self.root, exist_ok=True)
+            dbs = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            dbs.execute("PRAGMA journal_mode=WAL")
+            dbs.execute("PRAGMA synchronous=NORMAL")
+            dbs.execute(
+                        "CREATE TABLE IF NOT EXISTS revisions ("
+                        "fnm TEXT PRIMARY KEY, otp TEXT, uid TEXT, data BLOB)"
+                       )
+            dbs.execute(
+                        "CREATE INDEX IF NOT EXISTS revisions_uid "
+                        "ON revisions (otp, uid, fnm)"
+                       )
+            dbs.execute(
+                        "CREATE TABLE IF NOT EXISTS latest ("
+                        "otp TEXT, uid TEXT, tme REAL, fnm TEXT, flds TEXT, "
+                        "PRIMARY KEY (otp, uid))"
+                       )
+            self.local.dbs = dbs
+        return dbs
+
+    def entries(self, otp):
+        res = {}
+        for uid, tme, fnm, flds in self.db().execute(
+                                                       "SELECT uid, tme, fnm, flds FROM latest WHERE otp = ?",
+                                                       (otp,)
+                                                      ):
+            res[uid] = (tme, fnm, json.loads(flds) if flds else None)
+        return res
+
+    def exists(self, otp):
+        return self.db().execute(
+                                 "SELECT 1 FROM revisions WHERE otp = ? LIMIT 1",
+                                 (otp,)
+                                ).fetchone() is not None
+
+    def index(self, entries):
+        self.transaction((LATEST, self.latest(entries)))
+
+    @staticmethod
+    def latest(entries):
+        rows = []
+        for tme, fnm, flds in entries:
+            otp, uid = fnm.split(os.sep)[:2]
+            rows.append((otp, uid, tme, fnm, json.dumps(flds) if flds is not None else None))
+        return rows
+
+    def read(self, fnm):
+        row = self.db().execute(
+                                "SELECT data FROM revisions WHERE fnm = ?",
+                                (fnm,)
+                               ).fetchone()
+        if row:
+            return row[0]
+        return None
+
+    def reindex(self, otp, entries):
+        dbs = self.db()
+        with dbs:
+            dbs.execute("BEGIN")
+            dbs.execute("DELETE FROM latest WHERE otp = ?", (otp,))
+            self.index(entries.values())
+
+    def remove(self, otp, fnms):
+        rows = [(fnm,) for fnm in fnms]
+        dbs = self.db()
+        with dbs:
+            dbs.execute("BEGIN")
+            dbs.executemany("DELETE FROM revisions WHERE fnm = ?", rows)
+            dbs.executemany("DELETE FROM latest WHERE fnm = ?", rows)
+        return len(rows)
+
+    def revisions(self, otp):
+        return [x[0] for x in self.db().execute(
+                                                 "SELECT fnm FROM revisions WHERE otp = ? ORDER BY fnm",
+                                                 (otp,)
+                                                )]
+
+    def scan(self, otp):
+        res = {}
+        for uid, fnm in self.db().execute(
+                                          "SELECT uid, max(fnm) FROM revisions WHERE otp = ? GROUP BY uid",
+                                          (otp,)
+                                         ):
+            res[uid] = fnm
+        return res
+
+    def types(self):
+        return [x[0] for x in self.db().execute("SELECT DISTINCT otp FROM revisions")]
+
+    def transaction(self, *statements):
+        dbs = self.db()
+        if dbs.in_transaction:
+            for sql, rows in statements:
+                dbs.executemany(sql, rows)
+            return
+        with dbs:
+            dbs.execute("BEGIN")
+            for sql, rows in statements:
+                dbs.executemany(sql, rows)
+
+    def write(self, fnm, data):
+        self.write_many([(fnm, data)])
+
+    def write_many(self, records, entries=()):
+        "revisions and their latest entries go in one transaction"
+        self.transaction(
+                         (REVISIONS, [(fnm,) + tuple(fnm.split(os.sep)[:2]) + (data,) for fnm, data in records]),
+                         (LATEST, self.latest(entries))
+                        )
+
+
+class Lock:
+
+    "per type lock, taken in this process and on a lock file for others"
+
+    def __init__(self, path):
+        self.lock = _thread.allocate_lock()
+        self.path = path
+        self.fds = []
+
+    def __enter__(self):
+        self.lock.acquire()
+        os.makedirs(self.path, exist_ok=True)
+        fds = os.open(os.path.join(self.path, "lock"), os.O_RDWR | os.O_CREAT)
+        fcntl.flock(fds, fcntl.LOCK_EX)
+        self.fds.append(fds)
+        return self
+
+    def __exit__(self, *args):
+        fds = self.fds.pop()
+        fcntl.flock(fds, fcntl.LOCK_UN)
+        os.close(fds)
+        self.lock.release()
+
+
+def migrate(src, dst):
+    nmr = 0
+    for otp in src.types():
+        for fnm in src.revisions(otp):
+            data = src.read(fnm)
+            if data is None:
+                continue
+            dst.write(fnm, data)
+            nmr += 1
+    return nmr
+
+
+backends = {
+            "files": Files,
+            "log": Segments,
+            "sqlite": Sqlite
+           }
@@ -8,11 +8,18 @@
 import queue
 import threading
 import time
+import traceback
 import types
+import _thread
+
+
+from .loop import Loop
 
 
 def __dir__():
     return (
+            'Pool',
+            'Task',
             'Thread',
             'Timer',
             'Repeater',
@@ -59,11 +66,126 @@ class Thread(threading.Thread):
         func, args = self.queue.get()
         if args:
             self._evt = args[0]
-            if "txt" in self._evt:
-                self.name = self._evt.txt
+            txt = getattr(self._evt, "txt", None)
+            if txt and isinstance(txt, str):
+                self.name = txt
         self.starttime = time.time()
         self._result = func(*args)
 
+class Task:
+
+    "handle of a function run on a pool, join() returns its result"
+
+    def __init__(self, func, thrname, *args):
+        self._evt = None
+        self._exc = None
+        self._result = None
+        self.args = args
+        self.done = threading.Event()
+        self.func = func
+        self.name = thrname or name(func)
+        self.sleep = None
+        self.starttime = time.time()
+        self.state = None
+        if args:
+            self._evt = args[0]
+            txt = getattr(self._evt, "txt", None)
+            if txt and isinstance(txt, str):
+                self.name = txt
+
+    def is_alive(self):
+        return not self.done.is_set()
+
+    def join(self, timeout=None):
+        self.done.wait(timeout)
+        return self._result
+
+    def run(self):
+        self.starttime = time.time()
+        try:
+            self._result = self.func(*self.args)
+        except Exception as ex:
+            self._exc = ex
+            traceback.print_exc()
+        finally:
+            self.done.set()
+
+
+class Pool:
+
+    """bounded set of worker threads running launched functions.
+
+    workers are started on demand, up to size, and then stay around
+    waiting for work. functions that never return (loops, servers) should
+    be launched with pooled=False so they get a thread of their own.
+
+    """
+
+    pools = {}
+
+    def __init__(self, pname, size=32):
+        self.busy = 0
+        self.done = 0
+        self.idle = 0
+        self.lock = _thread.allocate_lock()
+        self.maxqueued = 0
+        self.name = pname
+        self.queue = queue.Queue()
+        self.size = size
+        self.waited = 0.0
+        self.workers = []
+
+    @staticmethod
+    def get(pname="default"):
+        if pname not in Pool.pools:
+            Pool.pools[pname] = Pool(pname)
+        return Pool.pools[pname]
+
+    def put(self, task):
+        with self.lock:
+            self.queue.put_nowait(task)
+            self.maxqueued = max(self.maxqueued, self.queue.qsize())
+            if self.idle < self.queue.qsize() and len(self.workers) < self.size:
+                thr = threading.Thread(
+                                       target=self.work,
+                                       name="%s/idle" % self.name,
+                                       daemon=True
+                                      )
+                self.workers.append(thr)
+                thr.start()
+        return task
+
+    def stats(self):
+        return {
+                "busy": self.busy,
+                "done": self.done,
+                "maxqueued": self.maxqueued,
+                "queued": self.queue.qsize(),
+                "size": self.size,
+                "waited": round(self.waited, 3),
+                "workers": len(self.workers)
+               }
+
+    def work(self):
+        thr = threading.current_thread()
+        while 1:
+            with self.lock:
+                self.idle += 1
+            task = self.queue.get()
+            with self.lock:
+                self.idle -= 1
+                self.busy += 1
+                self.waited += time.time() - task.starttime
+            thr.name = task.name
+            try:
+                task.run()
+            finally:
+                thr.name = "%s/idle" % self.name
+                with self.lock:
+                    self.busy -= 1
+                    self.done += 1
+
+
 class Timer:
 
     def __init__(self, sleep, func, *args, thrname=None):
@@ -80,6 +202,11 @@ class Timer:
         launch(self.func, *self.args)
 
     def start(self):
+        if Loop.enabled:
+            self.state["starttime"] = time.time()
+            self.state["latest"] = time.time()
+            self.timer = Loop.later(self.sleep, self.run)
+            return self.timer
         timer = threading.Timer(self.sleep, self.run)
         timer.name = self.name
         timer.daemon = True
@@ -148,9 +275,11 @@ def elapsed(seconds, short=True):
 
 def launch(func, *args, **kwargs):
     thrname = kwargs.get("name", name(func))
-    thr = Thread(func, thrname, *args)
-    thr.start()
-    return thr
+    if not kwargs.get("pooled", True):
+        thr = Thread(func, thrname, *args)
+        thr.start()
+        return thr
+    return Pool.get(kwargs.get("pool", "default")).put(Task(func, thrname, *args))
 
 
 def name(obj):
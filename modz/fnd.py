@@ -8,7 +8,7 @@
 import time
 
 
-from cmdz import Wd, elapsed, find, fntime, keys, printable
+from cmdz import Wd, elapsed, fntime, ifind, keys, planstats, printable
 
 
 def __dir__():
@@ -25,13 +25,16 @@ def fnd(event):
             event.reply("no types yet.")
         return
     otype = event.args[0]
-    nmr = 0
+    offset = int(event.sets.offset or 0)
+    limit = int(event.sets.limit) if event.sets.limit else None
+    nmr = offset
     keyz = None
     if event.gets:
         keyz = ",".join(keys(event.gets))
     if len(event.args) > 1:
         keyz += "," + ",".join(event.args[1:])
-    for obj in find(otype, event.gets):
+    stats = planstats() if "e" in event.opts else None
+    for obj in ifind(otype, event.gets, limit=limit, offset=offset, stats=stats):
         if not keyz:
             keyz = "," + ",".join(keys(obj))
         txt = "%s %s %s" % (
@@ -41,5 +44,13 @@ def fnd(event):
                            )
         nmr += 1
         event.reply(txt)
-    if not nmr:
+    if nmr == offset:
         event.reply("no result (%s)" % event.txt)
+    if stats is not None:
+        event.reply("plan=%s files=%s candidates=%s read=%s matched=%s" % (
+                                                                          stats.plan,
+                                                                          stats.files,
+                                                                          stats.candidates,
+                                                                          stats.read,
+                                                                          stats.matched
+                                                                         ))
@@ -9,7 +9,7 @@ import threading
 import time
 
 
-from cmdz import Bus, Object, elapsed, name, update
+from cmdz import Bus, Object, Pool, elapsed, name, update
 
 
 def __dir__():
@@ -30,7 +30,13 @@ def flt(event):
         return
     except (KeyError, TypeError, IndexError, ValueError):
         pass
-    event.reply(" | ".join([name(o) for o in Bus.objs]))
+    res = []
+    for obj in Bus.objs:
+        if "status" in dir(obj):
+            res.append(obj.status())
+        else:
+            res.append(name(obj))
+    event.reply(" | ".join(res))
 
 
 def thr(event):
@@ -52,6 +58,9 @@ def thr(event):
         event.reply(" ".join(res))
     else:
         event.reply("no threads running")
+    for pool in Pool.pools.values():
+        stats = pool.stats()
+        event.reply("%s %s" % (pool.name, " ".join(["%s=%s" % (x, stats[x]) for x in sorted(stats)])))
 
 
 def upt(event):
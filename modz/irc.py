@@ -6,7 +6,9 @@
 "irc"
 
 
+import asyncio
 import base64
+import collections
 import os
 import queue
 import random
@@ -18,20 +20,24 @@ import threading
 import _thread
 
 
-from cmdz import Class, Handler, Command, Default, Event, Object
-from cmdz import edit, fntime, find, keys, last, printable, save, update
-from cmdz import elapsed, launch, locked, register
+from cmdz import Class, Db, Handler, Command, Default, Event, Events, Object
+from cmdz import edit, fntime, find, keys, kind, printable, save, update
+from cmdz import Loop, elapsed, launch, register
 
 
 def __dir__():
     return (
             'Config',
             'IRC',
+            'Message',
             'cfg',
+            'configs',
             'dlt',
             'init',
             'met',
             'mre',
+            'parseline',
+            'parsetags',
             'pwd'
            )
 
@@ -39,17 +45,22 @@ def __dir__():
 __all__ = __dir__()
 
 
+ESCAPES = {":": ";", "s": " ", "r": "\r", "n": "\n"}
 NAME = "cmdz"
+PRIORITY = ["AUTHENTICATE", "CAP", "PONG"]
 REALNAME = "program your own commands"
 
 
-saylock = _thread.allocate_lock()
-
-
 def init():
-    irc = IRC()
-    irc.start()
-    return irc
+    cfgs = configs() or {"": Config()}
+    bots = []
+    for network in sorted(cfgs):
+        irc = IRC(cfgs[network])
+        if len(cfgs) > 1:
+            irc.aio = True
+        irc.start()
+        bots.append(irc)
+    return bots
 
 
 class NoUser(Exception):
@@ -57,13 +68,87 @@ class NoUser(Exception):
     pass
 
 
+class Bucket:
+
+    """token bucket limiting the lines a bot sends.
+
+    up to burst lines go out at once, after that one line per 1/rate
+    seconds. each sender reserves a token and sleeps until it is due.
+
+    """
+
+    def __init__(self, burst=4, rate=0.5):
+        self.burst = float(burst)
+        self.lock = _thread.allocate_lock()
+        self.maxwait = 0.0
+        self.maxwaiting = 0
+        self.rate = float(rate)
+        self.sent = 0
+        self.stamp = time.monotonic()
+        self.tokens = self.burst
+        self.waited = 0.0
+        self.waiting = 0
+
+    def delay(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= 1.0
+            if self.tokens >= 0.0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    async def asleep(self):
+        "wait for a token on the loop instead of blocking a thread"
+        sleep = self.delay()
+        if sleep:
+            await asyncio.sleep(sleep)
+        self.count(sleep)
+        return sleep
+
+    def count(self, sleep):
+        with self.lock:
+            self.sent += 1
+            self.waited += sleep
+            self.maxwait = max(self.maxwait, sleep)
+
+    def enter(self):
+        with self.lock:
+            self.waiting += 1
+            self.maxwaiting = max(self.maxwaiting, self.waiting)
+
+    def leave(self):
+        with self.lock:
+            self.waiting -= 1
+
+    def stats(self):
+        return {
+                "maxwait": round(self.maxwait, 3),
+                "maxwaiting": self.maxwaiting,
+                "sent": self.sent,
+                "waited": round(self.waited, 3),
+                "waiting": self.waiting
+               }
+
+    def wait(self):
+        sleep = self.delay()
+        if sleep:
+            time.sleep(sleep)
+        self.count(sleep)
+        return sleep
+
+
 class Config(Default):
 
+    burst = 4
     channel = "#%s" % NAME
     control = "!"
+    network = ""
     nick = "%s" % NAME
     password = ""
     port = 6667
+    rate = 0.5
     realname = "%s" % REALNAME
     sasl = False
     server = "localhost"
@@ -74,11 +159,14 @@ class Config(Default):
 
     def __init__(self):
         super().__init__()
+        self.burst = Config.burst
         self.control = Config.control
         self.channel = Config.channel
+        self.network = Config.network
         self.nick = Config.nick
         self.password = Config.password
         self.port = Config.port
+        self.rate = Config.rate
         self.realname = Config.realname
         self.sasl = Config.sasl
         self.server = Config.server
@@ -99,10 +187,28 @@ class IEvent(Event):
         self.nick = ""
         self.origin = ""
         self.rawstr = ""
+        self.tags = {}
         self.type = "event"
         self.txt = ""
 
 
+class Message:
+
+    "parsed server line, turned into an IEvent only when it gets dispatched"
+
+    __slots__ = ("command", "nick", "origin", "params", "prefix", "rawstr", "tags", "txt")
+
+    def __init__(self):
+        self.command = ""
+        self.nick = ""
+        self.origin = ""
+        self.params = []
+        self.prefix = ""
+        self.rawstr = ""
+        self.tags = None
+        self.txt = ""
+
+
 class TextWrap(textwrap.TextWrapper):
 
     def __init__(self):
@@ -117,12 +223,48 @@ class TextWrap(textwrap.TextWrapper):
 
 class Output(Object):
 
-    cache = {}
+    """per channel output queues, drained round robin.
+
+    a channel gets at most maxpending lines queued, lines beyond that
+    go to the !mre cache so one busy channel can't hold up the others.
+
+    with aio set the queues are drained by a task on the asyncio loop,
+    that is the case in async mode (loop=async) and for every bot when
+    more than one network is configured, without making the rest of the
+    process async.
+
+    """
+
+    maxpending = 10
 
     def __init__(self):
         Object.__init__(self)
-        self.oqueue = queue.Queue()
+        self.aio = Loop.enabled
+        self.aready = None
+        self.atask = None
+        self.cache = {}
         self.dostop = threading.Event()
+        self.order = collections.deque()
+        self.pending = {}
+        self.ready = threading.Condition()
+        self.spilled = set()
+
+    async def aoutput(self):
+        while not self.dostop.is_set():
+            item = self.pop()
+            if not item:
+                await self.areadied().wait()
+                self.areadied().clear()
+                continue
+            await self.asay(*item)
+
+    def areadied(self):
+        if not self.aready:
+            self.aready = asyncio.Event()
+        return self.aready
+
+    async def asay(self, channel, txt):
+        self.dosay(channel, txt)
 
     def dosay(self, channel, txt):
         raise NotImplementedError
@@ -140,26 +282,62 @@ class Output(Object):
             pass
         return value
 
+    def notify(self):
+        with self.ready:
+            self.ready.notify_all()
+        if self.aio:
+            Loop.call(lambda: self.areadied().set())
+
     def oput(self, channel, txt):
-        self.oqueue.put_nowait((channel, txt))
+        wrapper = TextWrap()
+        txtlist = wrapper.wrap(txt)
+        cached = len(txtlist) > 3
+        if cached:
+            self.extend(channel, txtlist)
+            txtlist = ["%s put in cache, use !mre to show more" % len(txtlist)]
+        with self.ready:
+            if channel not in self.pending:
+                self.pending[channel] = collections.deque()
+                self.order.append(channel)
+            pending = self.pending[channel]
+            if len(pending) + len(txtlist) > self.maxpending:
+                if not cached:
+                    self.extend(channel, txtlist)
+                if channel not in self.spilled:
+                    self.spilled.add(channel)
+                    pending.append(None)
+            else:
+                pending.extend(txtlist)
+        self.notify()
 
     def output(self):
         while not self.dostop.is_set():
-            (channel, txt) = self.oqueue.get()
-            if channel is None and txt is None:
-                break
-            if self.dostop.is_set():
-                break
-            wrapper = TextWrap()
-            txtlist = wrapper.wrap(txt)
-            if len(txtlist) > 3:
-                self.extend(channel, txtlist)
-                self.dosay(channel, "%s put in cache, use !mre to show more" % len(txtlist))
-                continue
-            _nr = -1
-            for txt in txtlist:
-                _nr += 1
-                self.dosay(channel, txt)
+            with self.ready:
+                while not self.order and not self.dostop.is_set():
+                    self.ready.wait()
+            item = self.pop()
+            if item:
+                self.dosay(*item)
+
+    def pop(self):
+        with self.ready:
+            if not self.order or self.dostop.is_set():
+                return None
+            channel = self.order.popleft()
+            pending = self.pending[channel]
+            txt = pending.popleft()
+            if pending:
+                self.order.append(channel)
+            else:
+                del self.pending[channel]
+            if txt is None:
+                self.spilled.discard(channel)
+                txt = "%s more in cache, use !mre to show more" % self.size(channel)
+        return (channel, txt)
+
+    def queued(self):
+        with self.ready:
+            return sum([len(x) for x in self.pending.values()])
 
     def size(self, chan):
         if chan in self.cache:
@@ -168,38 +346,52 @@ class Output(Object):
 
     def start(self):
         self.dostop.clear()
-        launch(self.output)
+        if self.aio:
+            if not self.atask or self.atask.done():
+                self.atask = Loop.submit(self.aoutput())
+            return self
+        launch(self.output, pooled=False)
         return self
 
     def stop(self):
         self.dostop.set()
-        self.oqueue.put_nowait((None, None))
+        self.notify()
 
 
 class IRC(Handler, Output):
 
-    def __init__(self):
+    bufsize = 65536
+    recycle = True
+
+    def __init__(self, cfg=None):
         Handler.__init__(self)
         Output.__init__(self)
-        self.buffer = []
-        self.cfg = Config()
+        self.buffer = collections.deque()
+        self.cfg = cfg or Config()
+        self.bucket = Bucket(self.cfg.burst, self.cfg.rate)
         self.connected = threading.Event()
         self.channels = []
+        self.ajoined = None
         self.joined = threading.Event()
         self.keeprunning = False
         self.outqueue = queue.Queue()
+        self.rbuf = bytearray()
+        self.rchunk = bytearray(self.bufsize)
+        self.reader = None
+        self.rtask = None
+        self.saylock = _thread.allocate_lock()
         self.sock = None
         self.speed = "slow"
         self.state = Object()
         self.state.needconnect = False
         self.state.errors = []
         self.state.last = 0
-        self.state.lastline = ""
         self.state.nrconnect = 0
         self.state.nrerror = 0
         self.state.nrsend = 0
         self.state.pongcheck = False
         self.threaded = False
+        self.writer = None
         self.zelf = ""
         self.register("903", self.h903)
         self.register("904", self.h903)
@@ -212,10 +404,96 @@ class IRC(Handler, Output):
         self.register("QUIT", self.quit)
         self.register("command", Command.handle)
 
+    async def aconnect(self, server, port=6667):
+        self.state.nrconnect += 1
+        self.connected.clear()
+        ctx = None
+        if self.cfg.password:
+            self.cfg.sasl = True
+            ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            ctx.check_hostname = False
+            ctx.verify_mode = ssl.CERT_NONE
+        self.reader, self.writer = await asyncio.open_connection(server, port, ssl=ctx)
+        if ctx:
+            self.raw("CAP LS 302")
+        self.connected.set()
+        return True
+
+    async def adoconnect(self, server, nck, port=6667):
+        while 1:
+            try:
+                if await self.aconnect(server, port):
+                    break
+            except OSError as ex:
+                self.state.errors.append(str(ex))
+            await asyncio.sleep(self.cfg.sleep)
+        self.logon(server, nck)
+
+    async def akeep(self):
+        while 1:
+            self.keeprunning = True
+            await asyncio.sleep(self.cfg.sleep)
+            if not self.connected.is_set():
+                continue
+            self.state.pongcheck = True
+            self.raw("PING %s" % self.cfg.server)
+            await asyncio.sleep(10.0)
+            if self.state.pongcheck:
+                self.keeprunning = False
+                self.restart()
+                break
+
     def announce(self, txt):
         for channel in self.channels:
             self.say(channel, txt)
 
+    async def apoll(self):
+        while 1:
+            try:
+                line = await asyncio.wait_for(self.reader.readuntil(b"\r\n"), 180.0)
+            except (
+                    asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError,
+                    asyncio.TimeoutError,
+                    ConnectionResetError
+                   ) as ex:
+                self.joined.clear()
+                evt = IEvent()
+                evt.txt = str(ex) or ex.__class__.__name__
+                evt.type = "ERROR"
+                evt.orig = repr(self)
+                return evt
+            evt = self.event(str(line[:-2], "utf-8", "replace"))
+            if evt:
+                return evt
+
+    async def asay(self, channel, txt):
+        while not self.joined.is_set():
+            if not self.ajoined:
+                self.ajoined = asyncio.Event()
+            self.ajoined.clear()
+            if not self.joined.is_set():
+                await self.ajoined.wait()
+        await self.acommand("PRIVMSG", channel, str(txt).replace("\n", "").replace("  ", " "))
+
+    async def acommand(self, cmd, *args):
+        txt = IRC.line(cmd, *args)
+        if cmd.split()[0].upper() in PRIORITY:
+            self.raw(txt)
+            return
+        self.bucket.enter()
+        try:
+            await self.bucket.asleep()
+            self.raw(txt)
+        finally:
+            self.bucket.leave()
+
+    async def arun(self, server, nck, port=6667):
+        await self.adoconnect(server, nck, port)
+        if not self.keeprunning:
+            asyncio.ensure_future(self.akeep())
+        await self.aloop()
+
     def auth(self, event):
         time.sleep(1.0)
         self.raw("AUTHENTICATE %s" % self.cfg.password)
@@ -227,28 +505,41 @@ class IRC(Handler, Output):
         else:
             self.raw("CAP REQ :sasl")
 
-    @locked(saylock)
     def command(self, cmd, *args):
+        txt = IRC.line(cmd, *args)
+        if cmd.split()[0].upper() in PRIORITY:
+            self.raw(txt)
+            return
+        self.bucket.enter()
+        try:
+            with self.saylock:
+                self.bucket.wait()
+                self.raw(txt)
+        finally:
+            self.bucket.leave()
+
+    @staticmethod
+    def line(cmd, *args):
         if not args:
-            self.raw(cmd)
+            txt = cmd
         elif len(args) == 1:
-            self.raw("%s %s" % (cmd.upper(), args[0]))
+            txt = "%s %s" % (cmd.upper(), args[0])
         elif len(args) == 2:
-            self.raw("%s %s :%s" % (cmd.upper(), args[0], " ".join(args[1:])))
-        elif len(args) >= 3:
-            self.raw(
-                "%s %s %s :%s" % (cmd.upper(),
-                                  args[0],
-                                  args[1],
-                                  " ".join(args[2:]))
-            )
-        if (time.time() - self.state.last) < 5.0:
-            time.sleep(5.0)
-        self.state.last = time.time()
+            txt = "%s %s :%s" % (cmd.upper(), args[0], " ".join(args[1:]))
+        else:
+            txt = "%s %s %s :%s" % (
+                                    cmd.upper(),
+                                    args[0],
+                                    args[1],
+                                    " ".join(args[2:])
+                                   )
+        return txt
 
     def connect(self, server, port=6667):
         self.state.nrconnect += 1
         self.connected.clear()
+        self.buffer.clear()
+        self.rbuf.clear()
         if self.cfg.password:
             self.cfg.sasl = True
             ctx = ssl.SSLContext(ssl.PROTOCOL_TLS)
@@ -296,29 +587,37 @@ class IRC(Handler, Output):
         self.stop()
 
     def event(self, txt):
-        evt = self.parsing(txt)
-        cmd = evt.command
+        msg = parseline(txt)
+        cmd = msg.command
         if cmd == "PING":
             self.state.pongcheck = True
-            self.command("PONG", evt.txt or "")
+            self.command("PONG", msg.txt or "")
         elif cmd == "PONG":
             self.state.pongcheck = False
         if cmd == "001":
             self.state.needconnect = False
             if self.cfg.servermodes:
-                self.command("MODE %s %s" % (self.cfg.nick, self.cfg.servermodes))
-            self.zelf = evt.args[-1]
-            self.joinall()
+                launch(self.command, "MODE %s %s" % (self.cfg.nick, self.cfg.servermodes))
+            spl = msg.txt.split()
+            if spl:
+                self.zelf = spl[-1]
+            launch(self.joinall)
         elif cmd == "002":
-            self.state.host = evt.args[2][:-1]
+            spl = msg.txt.split()
+            if len(spl) > 3:
+                self.state.host = spl[3][:-1]
         elif cmd == "366":
             self.state.errors = []
             self.joined.set()
+            if self.ajoined:
+                Loop.call(self.ajoined.set)
         elif cmd == "433":
             self.state.errors.append(txt)
             nck = self.cfg.nick + "_" + str(random.randint(1,10))
-            self.command("NICK", nck)
-        return evt
+            launch(self.command, "NICK", nck)
+        if getattr(self.cbs, cmd, None) is None:
+            return None
+        return self.promote(msg)
 
     def fileno(self):
         return self.sock.fileno()
@@ -376,76 +675,45 @@ class IRC(Handler, Output):
             self.command("NOTICE", event.channel, txt)
 
     def parsing(self, txt):
-        rawstr = str(txt)
-        rawstr = rawstr.replace("\u0001", "")
-        rawstr = rawstr.replace("\001", "")
-        obj = IEvent()
-        obj.rawstr = rawstr
-        obj.command = ""
-        obj.arguments = []
-        arguments = rawstr.split()
-        if arguments:
-            obj.origin = arguments[0]
-        else:
-            obj.origin = self.cfg.server
-        if obj.origin.startswith(":"):
-            obj.origin = obj.origin[1:]
-            if len(arguments) > 1:
-                obj.command = arguments[1]
-                obj.type = obj.command
-            if len(arguments) > 2:
-                txtlist = []
-                adding = False
-                for arg in arguments[2:]:
-                    if arg.count(":") <= 1 and arg.startswith(":"):
-                        adding = True
-                        txtlist.append(arg[1:])
-                        continue
-                    if adding:
-                        txtlist.append(arg)
-                    else:
-                        obj.arguments.append(arg)
-                obj.txt = " ".join(txtlist)
-        else:
-            obj.command = obj.origin
-            obj.origin = self.cfg.server
-        try:
-            obj.nick, obj.origin = obj.origin.split("!")
-        except ValueError:
-            obj.nick = ""
-        target = ""
-        if obj.arguments:
-            target = obj.arguments[0]
-        if target.startswith("#"):
-            obj.channel = target
-        else:
-            obj.channel = obj.nick
-        if not obj.txt:
-            obj.txt = rawstr.split(":", 2)[-1]
-        if not obj.txt and len(arguments) == 1:
-            obj.txt = arguments[1]
-        spl = obj.txt.split()
-        if len(spl) > 1:
-            obj.args = spl[1:]
-        obj.type = obj.command
-        obj.orig = repr(self)
-        obj.txt = obj.txt.strip()
-        return obj
+        return self.promote(parseline(txt))
 
     def poll(self):
-        self.connected.wait()
-        if not self.buffer:
-            try:
-                self.some()
-            except (socket.timeout, ConnectionResetError) as ex:
-                self.joined.clear()
-                time.sleep(5.0)
-                evt = IEvent()
-                evt.txt = str(ex)
-                evt.type = "ERROR"
-                evt.orig = repr(self)
+        while 1:
+            self.connected.wait()
+            while not self.buffer:
+                try:
+                    self.some()
+                except (socket.timeout, ConnectionResetError) as ex:
+                    self.joined.clear()
+                    time.sleep(5.0)
+                    evt = IEvent()
+                    evt.txt = str(ex)
+                    evt.type = "ERROR"
+                    evt.orig = repr(self)
+                    return evt
+            evt = self.event(self.buffer.popleft())
+            if evt:
                 return evt
-        return self.event(self.buffer.pop(0))
+
+    def promote(self, msg):
+        evt = Events.get(IEvent)
+        evt.rawstr = msg.rawstr
+        evt.command = msg.command
+        evt.type = msg.command
+        evt.arguments = msg.params
+        evt.tags = msg.tags or {}
+        evt.nick = msg.nick
+        evt.origin = msg.origin or self.cfg.server
+        evt.txt = msg.txt.strip()
+        if msg.params and msg.params[0].startswith("#"):
+            evt.channel = msg.params[0]
+        else:
+            evt.channel = msg.nick
+        spl = evt.txt.split()
+        if len(spl) > 1:
+            evt.args = spl[1:]
+        evt.orig = repr(self)
+        return evt
 
     def privmsg(self, event):
         if event.txt:
@@ -476,7 +744,9 @@ class IRC(Handler, Output):
         txt = txt[:512]
         txt += "\n"
         txt = bytes(txt, "utf-8")
-        if self.sock:
+        if self.writer:
+            Loop.call(self.writer.write, txt)
+        elif self.sock:
             try:
                 self.sock.send(txt)
             except (ConnectionResetError, BrokenPipeError) as ex:
@@ -487,6 +757,9 @@ class IRC(Handler, Output):
         self.state.nrsend += 1
 
     def reconnect(self):
+        if self.aio:
+            self.restart()
+            return
         try:
             self.disconnect()
         except OSError:
@@ -504,40 +777,90 @@ class IRC(Handler, Output):
     def some(self):
         self.connected.wait()
         if not self.sock:
-            return
-        inbytes = self.sock.recv(512)
-        txt = str(inbytes, "utf-8")
-        if txt == "":
+            raise ConnectionResetError("no socket")
+        nbytes = self.sock.recv_into(self.rchunk)
+        if not nbytes:
             raise ConnectionResetError
-        self.state.lastline += txt
-        splitted = self.state.lastline.split("\r\n")
-        for line in splitted[:-1]:
-            self.buffer.append(line)
-        self.state.lastline = splitted[-1]
+        rbuf = self.rbuf
+        rbuf += memoryview(self.rchunk)[:nbytes]
+        start = 0
+        while 1:
+            end = rbuf.find(b"\r\n", start)
+            if end == -1:
+                break
+            self.buffer.append(str(rbuf[start:end], "utf-8", "replace"))
+            start = end + 2
+        del rbuf[:start]
 
     def start(self):
+        config = configs().get(self.cfg.network)
+        if config:
+            update(self.cfg, config)
+        self.bucket.burst = float(self.cfg.burst)
+        self.bucket.rate = float(self.cfg.rate)
         assert self.cfg.nick
         assert self.cfg.server
-        last(self.cfg)
         if self.cfg.channel not in self.channels:
             self.channels.append(self.cfg.channel)
         self.connected.clear()
         self.joined.clear()
+        if self.aio:
+            Output.start(self)
+            self.stopped.clear()
+            self.rtask = Loop.submit(
+                                     self.arun(
+                                               self.cfg.server,
+                                               self.cfg.nick,
+                                               int(self.cfg.port or "6667")
+                                              )
+                                    )
+            return
         launch(Output.start, self)
-        launch(Handler.start, self)
+        launch(Handler.start, self, pooled=False)
         launch(
                self.doconnect,
                self.cfg.server,
                self.cfg.nick,
-               int(self.cfg.port or "6667")
+               int(self.cfg.port or "6667"),
+               pooled=False
               )
         if not self.keeprunning:
-            launch(self.keep)
+            launch(self.keep, pooled=False)
+
+    def status(self):
+        stats = self.bucket.stats()
+        txt = "%s %s %s@%s:%s" % (
+                                  self.cfg.network or "default",
+                                  " ".join(self.channels),
+                                  self.cfg.nick,
+                                  self.cfg.server,
+                                  self.cfg.port
+                                 )
+        txt += " connected" if self.connected.is_set() else " disconnected"
+        txt += " sent=%s connects=%s errors=%s" % (
+                                                   self.state.nrsend,
+                                                   self.state.nrconnect,
+                                                   len(self.state.errors)
+                                                  )
+        txt += " pending=%s queued=%s maxqueued=%s waited=%ss maxwait=%ss" % (
+                                                                              self.queued(),
+                                                                              stats["waiting"],
+                                                                              stats["maxwaiting"],
+                                                                              stats["waited"],
+                                                                              stats["maxwait"]
+                                                                             )
+        return txt
 
     def stop(self):
+        if self.rtask:
+            self.rtask.cancel()
+            self.rtask = None
+        if self.writer:
+            Loop.call(self.writer.close)
+            self.writer = None
         try:
             self.sock.shutdown(2)
-        except OSError:
+        except (AttributeError, OSError):
             pass
         Handler.stop(self)
 
@@ -600,18 +923,35 @@ class User(Object):
 
 
 def cfg(event):
-    config = Config()
-    last(config)
-    if not event.sets:
-        event.reply(printable(
-                              config,
-                              keys(config),
-                              skip="control,password,realname,sleep,username")
-                             )
-    else:
+    cfgs = configs()
+    network = event.sets.network or ""
+    config = cfgs.get(network) or Config()
+    config.network = network
+    if [x for x in keys(event.sets) if x != "network"]:
         edit(config, event.sets)
         save(config)
         event.done()
+        return
+    if not event.sets.network and len(cfgs) > 1:
+        for nme in sorted(cfgs):
+            event.reply(printable(
+                                  cfgs[nme],
+                                  keys(cfgs[nme]),
+                                  skip="control,password,realname,sleep,username")
+                                 )
+        return
+    event.reply(printable(
+                          config,
+                          keys(config),
+                          skip="control,password,realname,sleep,username")
+                         )
+
+
+def configs():
+    res = {}
+    for config in Db.find(kind(Config())):
+        res[config.network or ""] = config
+    return res
 
 
 def dlt(event):
@@ -664,6 +1004,62 @@ def mre(event):
     event.reply("%s more in cache" % size)
 
 
+def parseline(txt):
+    msg = Message()
+    if "\001" in txt:
+        txt = txt.replace("\001", "")
+    msg.rawstr = txt
+    pos = 0
+    if txt.startswith("@"):
+        pos = txt.find(" ")
+        if pos == -1:
+            pos = len(txt)
+        msg.tags = parsetags(txt[1:pos])
+        while txt.startswith(" ", pos):
+            pos += 1
+    if txt.startswith(":", pos):
+        end = txt.find(" ", pos)
+        if end == -1:
+            end = len(txt)
+        msg.prefix = txt[pos+1:end]
+        nick, sep, origin = msg.prefix.partition("!")
+        if sep:
+            msg.nick = nick
+            msg.origin = origin
+        else:
+            msg.origin = msg.prefix
+        pos = end + 1
+    end = txt.find(" :", pos)
+    if end == -1:
+        params = txt[pos:].split()
+    else:
+        params = txt[pos:end].split()
+        msg.txt = txt[end+2:]
+    if params:
+        msg.command = params[0]
+        msg.params = params[1:]
+    if not msg.txt and msg.params:
+        msg.txt = msg.params[-1]
+    return msg
+
+
+def parsetags(txt):
+    tags = {}
+    for tag in txt.split(";"):
+        key, _sep, value = tag.partition("=")
+        if "\\" in value:
+            res = []
+            chars = iter(value)
+            for char in chars:
+                if char == "\\":
+                    char = next(chars, "")
+                    char = ESCAPES.get(char, char)
+                res.append(char)
+            value = "".join(res)
+        tags[key] = value
+    return tags
+
+
 def pwd(event):
     if len(event.args) != 2:
         event.reply("pwd <nick> <password>")
@@ -676,4 +1072,4 @@ def pwd(event):
 
 
 Class.add(Config)
-Class.add(User)
+Class.add(User, index="user")
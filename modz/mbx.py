@@ -5,21 +5,30 @@
 "mailbox"
 
 
+import collections
+import concurrent.futures
+import email
+import hashlib
 import mailbox
+import mmap
+import multiprocessing
 import os
 import time
 
 
-from cmdz import Class, Object
-from cmdz import elapsed, find, fntime, printable, save
+from cmdz import Bus, Class, Object, Wd
+from cmdz import batch, cdir, elapsed, find, fntime, ifind, printable, remote, save
 
 
 def __dir__():
     return (
             "Email",
+            "Importer",
+            "boundaries",
             "cor",
             "eml",
-            "mbx"
+            "mbx",
+            "parsechunk"
            )
 
 
@@ -63,7 +72,143 @@ class Email(Object):
         self.text = ""
 
 
-Class.add(Email)
+Class.add(Email, index="From")
+
+
+class Importer:
+
+    """streaming mbox import.
+
+    the mbox is mmapped and scanned for "From " lines, the messages are
+    handed out in chunks of byte ranges to a pool of processes that parse
+    them and return headers and text. the chunks are saved in order in one
+    batch each, after a chunk is flushed its end offset is written to a
+    checkpoint file in <workdir>/mbx so an interrupted (or later appended
+    to) mbox is continued where the last import stopped.
+
+    """
+
+    chunksize = 4 * 1024 * 1024
+    maxchunk = 500
+    report = 5.0
+    workers = os.cpu_count() or 1
+
+    def __init__(self, path, workers=None):
+        self.path = os.path.abspath(path)
+        self.nrs = 0
+        self.offset = 0
+        self.size = 0
+        self.workers = Importer.workers if workers is None else workers
+
+    def checkpoint(self):
+        path = Importer.cpath(self.path)
+        cdir(path)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("%s %s\n" % (self.offset, self.size))
+
+    def chunks(self, mapped):
+        ranges = []
+        nrbytes = 0
+        for start, end in boundaries(mapped, self.offset):
+            ranges.append((start, end))
+            nrbytes += end - start
+            if nrbytes >= Importer.chunksize or len(ranges) >= Importer.maxchunk:
+                yield ranges
+                ranges = []
+                nrbytes = 0
+        if ranges:
+            yield ranges
+
+    @staticmethod
+    def cpath(path):
+        return os.path.join(Wd.get(), "mbx", hashlib.sha1(bytes(path, "utf-8")).hexdigest())
+
+    def load(self):
+        "offset to continue from, 0 when the mbox shrunk (was replaced)"
+        try:
+            with open(Importer.cpath(self.path), "r", encoding="utf-8") as file:
+                offset = int(file.read().split()[0])
+        except (FileNotFoundError, IndexError, ValueError):
+            return 0
+        return offset if offset <= os.path.getsize(self.path) else 0
+
+    def run(self, progress=None, restart=False):
+        self.size = os.path.getsize(self.path)
+        self.offset = 0 if restart else self.load()
+        if self.offset >= self.size:
+            return 0
+        with open(self.path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if self.workers > 1:
+                    self.pooled(mapped, progress)
+                else:
+                    for ranges in self.chunks(mapped):
+                        self.store(ranges, parsechunk(self.path, ranges), progress)
+        return self.nrs
+
+    def pooled(self, mapped, progress):
+        pending = collections.deque()
+        with concurrent.futures.ProcessPoolExecutor(self.workers, mp_context=context()) as executor:
+            for ranges in self.chunks(mapped):
+                pending.append((ranges, executor.submit(remote, __file__, "parsechunk", self.path, ranges)))
+                if len(pending) > 2 * self.workers:
+                    ranges, future = pending.popleft()
+                    self.store(ranges, future.result(), progress)
+            while pending:
+                ranges, future = pending.popleft()
+                self.store(ranges, future.result(), progress)
+
+    def store(self, ranges, results, progress):
+        with batch():
+            for headers, text in results:
+                obj = Email(headers)
+                obj.text = text
+                save(obj)
+        self.nrs += len(results)
+        self.offset = ranges[-1][1]
+        self.checkpoint()
+        if progress:
+            progress(self)
+
+
+def boundaries(mapped, start=0):
+    "(start, end) byte offsets of the messages in a mmapped mbox"
+    size = len(mapped)
+    if mapped[start:start+5] != b"From ":
+        start = mapped.find(b"\nFrom ", start)
+        if start == -1:
+            return
+        start += 1
+    while start < size:
+        nxt = mapped.find(b"\nFrom ", start + 5)
+        end = size if nxt == -1 else nxt + 1
+        yield start, end
+        start = end
+
+
+def context():
+    "workers don't fork the (threaded) bot, forkserver or spawn"
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def parse(msg):
+    text = ""
+    for payload in msg.walk():
+        if payload.get_content_type() == 'text/plain':
+            text += payload.get_payload()
+    return msg._headers, text.replace("\\n", "\n")
+
+
+def parsechunk(path, ranges):
+    "parse the messages at ranges in path, runs in the worker processes"
+    res = []
+    with open(path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start, end in ranges:
+                res.append(parse(email.message_from_bytes(mapped[start:end])))
+    return res
 
 
 def to_date(date):
@@ -107,7 +252,7 @@ def cor(event):
         event.reply("cor <email>")
         return
     _nr = -1
-    for _fn, email in find("email", {"From": event.args[0]}):
+    for obj in find("email", {"From": event.args[0]}):
         _nr += 1
         txt = ""
         if len(event.args) > 1:
@@ -116,8 +261,8 @@ def cor(event):
             txt = "From,Subject"
         event.reply("%s %s %s" % (
                                   _nr,
-                                  printable(email, txt, plain=True),
-                                  elapsed(time.time() - fntime(email.__stp__)))
+                                  printable(obj, txt, plain=True),
+                                  elapsed(time.time() - fntime(obj.__fnm__)))
                                  )
 
 
@@ -126,7 +271,7 @@ def eml(event):
         event.reply("eml <searchtxtinemail>")
         return
     _nr = -1
-    for obj in find("email"):
+    for obj in ifind("email"):
         if event.rest in obj.text:
             _nr += 1
             event.reply("%s %s %s" % (
@@ -138,29 +283,41 @@ def eml(event):
 
 def mbx(event):
     if not event.args:
-        event.reply("mbx <directory>")
+        event.reply("mbx <directory|mbox> [-r] [workers=<n>]")
         return
     fnm = os.path.expanduser(event.args[0])
     event.reply("reading from %s" % fnm)
     nmr = 0
-    if os.path.isdir(fnm):
-        thing = mailbox.Maildir(fnm, create=False)
-    elif os.path.isfile(fnm):
-        thing = mailbox.mbox(fnm, create=False)
-    else:
+    if os.path.isfile(fnm):
+        starttime = time.time()
+        last = [starttime]
+        def progress(imp):
+            if time.time() - last[0] < Importer.report:
+                return
+            last[0] = time.time()
+            Bus.say(event.orig, event.channel, "%s messages %s%% %s" % (
+                                                                       imp.nrs,
+                                                                       int(100 * imp.offset / imp.size),
+                                                                       elapsed(time.time() - starttime)
+                                                                      ))
+        workers = event.sets.workers
+        imp = Importer(fnm, int(workers) if workers else None)
+        nmr = imp.run(progress, "r" in event.opts)
+        event.reply("ok %s" % nmr)
+        return
+    if not os.path.isdir(fnm):
         return
+    thing = mailbox.Maildir(fnm, create=False)
     try:
         thing.lock()
     except FileNotFoundError:
         pass
-    for ema in thing:
-        email = Email(ema._headers)
-        email.text = ""
-        for payload in ema.walk():
-            if payload.get_content_type() == 'text/plain':
-                email.text += payload.get_payload()
-        email.text = email.text.replace("\\n", "\n")
-        save(email)
-        nmr += 1
+    with batch():
+        for ema in thing:
+            headers, text = parse(ema)
+            obj = Email(headers)
+            obj.text = text
+            save(obj)
+            nmr += 1
     if nmr:
         event.reply("ok %s" % nmr)
@@ -5,37 +5,49 @@
 "rich site syndicate"
 
 
+import datetime
+import email.utils
+import hashlib
+import heapq
 import html.parser
+import http.client
+import os
+import random
 import re
 import threading
 import time
 import urllib
+import xml.etree.ElementTree
 import _thread
 
 
-from urllib.error import HTTPError, URLError
 from urllib.parse import quote_plus, urlencode
 from urllib.request import Request, urlopen
 
 
-from cmdz import Bus, Cfg, Class, Db, Default, Object, Repeater
-from cmdz import find, fntime, last, printable, save, write
-from cmdz import edit, elapsed, launch, locked, register, spl, update
+from cmdz import Bus, Cfg, Class, Db, Default, Index, Object, Pool, Repeater, Wd
+from cmdz import cdir, find, fntime, hook, last, printable, save
+from cmdz import batch, edit, elapsed, launch, register, spl, update
 
 
 def __dir__():
     return (
+        "Connections",
+        "Dedup",
         "Feed",
         "Fetcher",
         "Rss",
+        "Schedule",
         "Seen",
+        "Stream",
         "debug",
         "init",
         "dpl",
         "ftc",
         "nme",
         "rem",
-        "rss"
+        "rss",
+        "sch"
     )
 
 
@@ -46,7 +58,53 @@ def init():
     return fetcher
 
 
-fetchlock = _thread.allocate_lock()
+class Connections:
+
+    """idle http(s) connections, kept per host for reuse.
+
+    a fetch takes an idle connection to the feed's host (or opens a new
+    one) and hands it back when the server keeps it open.
+
+    """
+
+    idle = {}
+    lock = _thread.allocate_lock()
+    maxidle = 4
+
+    @staticmethod
+    def clear():
+        with Connections.lock:
+            conns = [conn for idle in Connections.idle.values() for conn in idle]
+            Connections.idle.clear()
+        for conn in conns:
+            conn.close()
+
+    @staticmethod
+    def get(scheme, netloc, timeout):
+        with Connections.lock:
+            idle = Connections.idle.get((scheme, netloc))
+            if idle:
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+        return Connections.new(scheme, netloc, timeout), False
+
+    @staticmethod
+    def new(scheme, netloc, timeout):
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        return http.client.HTTPConnection(netloc, timeout=timeout)
+
+    @staticmethod
+    def put(scheme, netloc, conn):
+        with Connections.lock:
+            idle = Connections.idle.setdefault((scheme, netloc), [])
+            if len(idle) < Connections.maxidle:
+                idle.append(conn)
+                return
+        conn.close()
 
 
 class Feed(Default):
@@ -59,26 +117,178 @@ class Rss(Object):
     def __init__(self):
         super().__init__()
         self.display_list = "title,link,author"
+        self.etag = ""
+        self.modified = ""
         self.name = ""
         self.rss = ""
 
 
+Class.add(Rss, index="rss")
+
+
 class Seen(Object):
 
+    "list of seen urls, as saved by older versions, see Dedup"
+
     def __init__(self):
         super().__init__()
         self.urls = []
 
 
+class Dedup:
+
+    """urls already announced, partitioned per feed.
+
+    each feed gets a dict of url -> time last seen in memory and an
+    append only file in <workdir>/seen, new urls are appended once per
+    fetch. a url that is seen again (in add() or has(), also when it
+    came from the legacy partition) gets its time refreshed, at most
+    once per refresh seconds, so urls that are still in a feed don't
+    expire. urls not seen for days are dropped on load, the file is
+    rewritten when more than half of its lines are stale.
+
+    """
+
+    days = 90
+    expired = 0.0
+    lock = _thread.allocate_lock()
+    partitions = {}
+    refresh = 24 * 60 * 60
+
+    @staticmethod
+    def add(feed, urls):
+        "record urls for feed, returns the ones not seen before"
+        new = []
+        old = []
+        with Dedup.lock:
+            seen = Dedup.get(feed)
+            legacy = Dedup.get("legacy")
+            for url in urls:
+                if url in seen or url in legacy:
+                    old.append(url)
+                    continue
+                if url not in new:
+                    new.append(url)
+            Dedup.stamp(feed, new + old)
+        return new
+
+    @staticmethod
+    def clear():
+        with Dedup.lock:
+            Dedup.partitions.clear()
+
+    @staticmethod
+    def has(feed, url):
+        with Dedup.lock:
+            if url in Dedup.get(feed) or url in Dedup.get("legacy"):
+                Dedup.stamp(feed, [url])
+                return True
+        return False
+
+    @staticmethod
+    def expire(now=None):
+        cutoff = (now or time.time()) - Dedup.days * 24 * 60 * 60
+        with Dedup.lock:
+            for feed in list(Dedup.partitions):
+                seen = Dedup.partitions[feed]
+                old = [url for url, tme in seen.items() if tme < cutoff]
+                for url in old:
+                    del seen[url]
+                if old:
+                    Dedup.rewrite(feed, seen)
+
+    @staticmethod
+    def get(feed):
+        seen = Dedup.partitions.get(feed)
+        if seen is None:
+            seen = Dedup.partitions[feed] = Dedup.load(feed)
+        return seen
+
+    @staticmethod
+    def load(feed):
+        seen = {}
+        path = Dedup.path(feed)
+        if not os.path.exists(path):
+            return seen
+        cutoff = time.time() - Dedup.days * 24 * 60 * 60
+        nrlines = 0
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                nrlines += 1
+                tme, _sep, url = line.rstrip("\n").partition(" ")
+                try:
+                    tme = int(tme)
+                except ValueError:
+                    continue
+                if tme >= cutoff and url:
+                    seen[url] = tme
+        if nrlines > 2 * len(seen):
+            Dedup.rewrite(feed, seen)
+        return seen
+
+    @staticmethod
+    def migrate():
+        "move the urls of an old Seen object into the legacy partition"
+        path = Dedup.path("legacy")
+        if os.path.exists(path):
+            return 0
+        old = Seen()
+        last(old)
+        now = int(time.time())
+        with Dedup.lock:
+            Dedup.partitions.pop("legacy", None)
+            Dedup.rewrite("legacy", {url: now for url in old.urls})
+        return len(old.urls)
+
+    @staticmethod
+    def path(feed):
+        return os.path.join(Wd.get(), "seen", hashlib.sha1(bytes(feed, "utf-8")).hexdigest())
+
+    @staticmethod
+    def stamp(feed, urls):
+        "set the time urls were seen to now, called with the lock held"
+        now = int(time.time())
+        seen = Dedup.get(feed)
+        urls = [url for url in urls if now - seen.get(url, 0) >= Dedup.refresh]
+        if not urls:
+            return
+        for url in urls:
+            seen[url] = now
+        path = Dedup.path(feed)
+        cdir(path)
+        with open(path, "a", encoding="utf-8") as file:
+            file.write("".join(["%s %s\n" % (now, url) for url in urls]))
+
+    @staticmethod
+    def rewrite(feed, seen):
+        path = Dedup.path(feed)
+        cdir(path)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            file.write("".join(["%s %s\n" % (tme, url) for url, tme in seen.items()]))
+        os.replace(tmp, path)
+
+
 class Fetcher(Object):
 
+    backoff = 300.0
+    chunksize = 16384
     dosave = False
-    seen = Seen()
+    errors = {}
+    hints = {}
+    lock = _thread.allocate_lock()
+    maxbackoff = 24*60*60.0
+    timeout = 30.0
+    workers = 8
 
     def __init__(self):
         super().__init__()
         self.connected = threading.Event()
 
+    @staticmethod
+    def announce(txt):
+        Bus.announce(txt)
+
     @staticmethod
     def display(obj):
         result = ""
@@ -100,51 +310,225 @@ class Fetcher(Object):
             result += " - "
         return result[:-2].rstrip()
 
-    @locked(fetchlock)
+    @staticmethod
+    def failed(feed, txt):
+        failures = Fetcher.errors.get(feed.rss, (0, 0.0, ""))[0] + 1
+        sleep = min(Fetcher.maxbackoff, Fetcher.backoff * 2 ** (failures - 1))
+        Fetcher.errors[feed.rss] = (failures, time.time() + sleep, str(txt))
+
     def fetch(self, feed):
+        if Cfg.debug:
+            return 0
+        headers = {}
+        if getattr(feed, "etag", ""):
+            headers["If-None-Match"] = feed.etag
+        if getattr(feed, "modified", ""):
+            headers["If-Modified-Since"] = feed.modified
+        stream = Stream(feed.display_list, lambda url: Dedup.has(feed.rss, normalize(url)))
+        try:
+            result = geturl(
+                            feed.rss,
+                            headers,
+                            float(getattr(feed, "timeout", "") or Fetcher.timeout),
+                            consume=stream.feed
+                           )
+        except (OSError, ValueError, http.client.HTTPException) as ex:
+            Fetcher.hints.pop(feed.rss, None)
+            self.failed(feed, ex)
+            return 0
+        Fetcher.hints[feed.rss] = gethints(result, stream)
+        if result.status == 304:
+            Fetcher.errors.pop(feed.rss, None)
+            return 0
+        if result.status >= 400:
+            self.failed(feed, "%s %s" % (result.status, result.reason))
+            return 0
+        Fetcher.errors.pop(feed.rss, None)
         counter = 0
         objs = []
-        for obj in reversed(list(getfeed(feed.rss, feed.display_list))):
-            fed = Feed()
-            update(fed, obj)
-            update(fed, feed)
-            if "link" in fed:
-                url = urllib.parse.urlparse(fed.link)
-                if url.path and not url.path == "/":
-                    uurl = "%s://%s/%s" % (url.scheme, url.netloc, url.path)
-                else:
-                    uurl = fed.link
-                if uurl in Fetcher.seen.urls:
-                    continue
-                Fetcher.seen.urls.append(uurl)
-            counter += 1
-            if self.dosave:
-                save(fed)
-            objs.append(fed)
-        if objs:
-            write(Fetcher.seen)
+        with batch():
+            etag = result.headers.get("etag", "")
+            modified = result.headers.get("last-modified", "")
+            if (etag, modified) != (getattr(feed, "etag", ""), getattr(feed, "modified", "")):
+                self.validators(feed, etag, modified)
+            feds = []
+            for obj in reversed(stream.close()):
+                fed = Feed()
+                update(fed, obj)
+                update(fed, feed)
+                uurl = None
+                if fed.link:
+                    uurl = normalize(fed.link)
+                feds.append((uurl, fed))
+            new = set(Dedup.add(feed.rss, [uurl for uurl, _fed in feds if uurl]))
+            for uurl, fed in feds:
+                if uurl:
+                    if uurl not in new:
+                        continue
+                    new.discard(uurl)
+                counter += 1
+                if self.dosave:
+                    save(fed)
+                objs.append(fed)
         txt = ""
         name = getattr(feed, "name")
         if name:
             txt = "[%s] " % name
         for obj in objs:
             txt2 = txt + self.display(obj)
-            Bus.announce(txt2.rstrip())
+            self.announce(txt2.rstrip())
         return counter
 
+    @staticmethod
+    def validators(feed, etag, modified):
+        "store etag/last-modified on the latest revision, a rem/nme/dpl made during the fetch stays"
+        feed.etag = etag
+        feed.modified = modified
+        otp, uid = feed.__fnm__.split(os.sep)[:2]
+        with Fetcher.lock:
+            entry = Index.get(otp).get(uid)
+            if not entry:
+                return
+            cur = hook(Wd.getpath(entry[1]))
+            if getattr(cur, "__deleted__", False):
+                return
+            cur.etag = etag
+            cur.modified = modified
+            save(cur)
+
     def run(self):
         thrs = []
+        Pool.get("rss").size = Fetcher.workers
+        now = time.time()
+        if now - Dedup.expired > 60 * 60:
+            Dedup.expired = now
+            Dedup.expire(now)
         for feed in find("rss"):
-            thrs.append(launch(self.fetch, feed))
+            if Fetcher.errors.get(feed.rss, (0, 0.0, ""))[1] > now:
+                continue
+            thrs.append(launch(self.fetch, feed, pool="rss"))
         return thrs
 
+    def poll(self):
+        now = time.time()
+        if now - Schedule.synced > Schedule.tick * 6:
+            Schedule.synced = now
+            Schedule.sync([feed.rss for feed in find("rss")], now)
+            if now - Dedup.expired > 60 * 60:
+                Dedup.expired = now
+                Dedup.expire(now)
+        Pool.get("rss").size = Fetcher.workers
+        thrs = []
+        for url in Schedule.due(now):
+            thrs.append(launch(self.scheduled, url, pool="rss"))
+        return thrs
+
+    def scheduled(self, url):
+        counter = 0
+        try:
+            for feed in find("rss", {"rss": url}):
+                if feed.rss == url:
+                    counter = self.fetch(feed)
+                    break
+        finally:
+            Schedule.done(url, counter, Fetcher.hints.get(url), Fetcher.errors.get(url))
+        return counter
+
     def start(self, repeat=True):
-        last(Fetcher.seen)
+        Dedup.migrate()
         if repeat:
-            repeater = Repeater(300.0, self.run)
+            repeater = Repeater(Schedule.tick, self.poll)
             repeater.start()
 
 
+class Schedule:
+
+    """per feed next fetch time, kept in a heap.
+
+    a feed that had new items is polled twice as often (down to
+    mininterval), one without new items 1.5 times less often (up to
+    maxinterval). Cache-Control max-age/Expires and the feed's <ttl> set
+    a lower bound, Retry-After and error backoff push the next fetch out.
+    a bit of jitter keeps feeds from lining up on the same tick.
+
+    """
+
+    feeds = {}
+    heap = []
+    interval = 300.0
+    jitter = 0.1
+    lock = _thread.allocate_lock()
+    maxinterval = 6*60*60.0
+    mininterval = 120.0
+    synced = 0.0
+    tick = 10.0
+
+    @staticmethod
+    def done(url, new, hint=None, error=None):
+        now = time.time()
+        with Schedule.lock:
+            sch = Schedule.feeds.get(url)
+            if not sch:
+                return None
+            sch.fetched = now
+            sch.new = new
+            if new:
+                sch.changed = now
+                sch.interval = max(Schedule.mininterval, sch.interval / 2)
+            else:
+                sch.interval = min(Schedule.maxinterval, sch.interval * 1.5)
+            sch.reason = "new" if new else "unchanged"
+            if hint:
+                floor = min(Schedule.maxinterval, max(hint.maxage, hint.ttl * 60))
+                if floor > sch.interval:
+                    sch.interval = floor
+                    sch.reason = "max-age" if hint.maxage >= hint.ttl * 60 else "ttl"
+            due = now + sch.interval * (1.0 + random.uniform(0, Schedule.jitter))
+            if hint and hint.retryafter and now + hint.retryafter > due:
+                due = now + hint.retryafter
+                sch.reason = "retry-after"
+            if error and error[1] > due:
+                due = error[1]
+                sch.reason = "backoff"
+            sch.due = due
+            heapq.heappush(Schedule.heap, (due, url))
+            return sch
+
+    @staticmethod
+    def due(now=None):
+        now = now or time.time()
+        res = []
+        with Schedule.lock:
+            while Schedule.heap and Schedule.heap[0][0] <= now:
+                due, url = heapq.heappop(Schedule.heap)
+                sch = Schedule.feeds.get(url)
+                if not sch or sch.due != due:
+                    continue
+                sch.due = 0.0
+                res.append(url)
+        return res
+
+    @staticmethod
+    def sync(urls, now=None):
+        now = now or time.time()
+        with Schedule.lock:
+            for url in list(Schedule.feeds):
+                if url not in urls:
+                    del Schedule.feeds[url]
+            for url in urls:
+                if url in Schedule.feeds:
+                    continue
+                sch = Object()
+                sch.changed = 0.0
+                sch.due = now + random.uniform(0, Schedule.interval)
+                sch.fetched = 0.0
+                sch.interval = Schedule.interval
+                sch.new = 0
+                sch.reason = "start"
+                Schedule.feeds[url] = sch
+                heapq.heappush(Schedule.heap, (sch.due, url))
+
+
 class Parser(Object):
 
     @staticmethod
@@ -166,7 +550,7 @@ class Parser(Object):
     @staticmethod
     def parse(txt, item="title,link"):
         res = []
-        for line in txt.split("<item>"):
+        for line in txt.split("<item>")[1:]:
             line = line.strip()
             obj = Object()
             for itm in spl(item):
@@ -175,17 +559,156 @@ class Parser(Object):
         return res
 
 
+class Stream:
+
+    """incremental parser for rss 2.0, rss 1.0 (rdf) and atom feeds.
+
+    feed() takes the response body in chunks and turns every finished
+    <item> or <entry> into an Object with the requested fields. reading
+    stops once stopafter items in a row are already seen, but only when
+    the dates of the items show the feed is ordered newest first, in an
+    oldest first (or undated) feed the new items come last. the body is
+    only buffered until the first item parsed, feeds that are not
+    well-formed xml before that are handed to Parser at close(), a parse
+    error after it ends the fetch with the items parsed so far.
+
+    """
+
+    aliases = {"author": ("author", "creator"), "description": ("description", "summary", "content")}
+    stopafter = 3
+
+    def __init__(self, items="title,link", seen=None):
+        self.data = bytearray()
+        self.failed = False
+        self.insequence = 0
+        self.items = [x for x in spl(items) if x]
+        self.newest = None
+        self.previous = None
+        self.parser = xml.etree.ElementTree.XMLPullParser(events=("end",))
+        self.result = []
+        self.seen = seen
+        self.stopped = False
+        self.ttl = 0
+
+    def close(self):
+        if not self.failed and not self.stopped:
+            try:
+                self.parser.close()
+                self.events()
+            except xml.etree.ElementTree.ParseError:
+                self.failed = True
+        if self.failed and self.data is not None:
+            return Parser.parse(str(self.data, "utf-8", "replace"), ",".join(self.items))
+        return self.result
+
+    def element(self, elem):
+        obj = Object()
+        children = {}
+        for child in elem:
+            children.setdefault(localname(child.tag), child)
+        for item in self.items:
+            for name in self.aliases.get(item, (item,)):
+                child = children.get(name)
+                if child is None:
+                    continue
+                if name == "link" and child.get("href"):
+                    links = [x for x in elem if localname(x.tag) == "link"]
+                    alternate = [x for x in links if x.get("rel", "alternate") == "alternate"]
+                    value = (alternate or links)[0].get("href")
+                elif localname(child.tag) == "author" and len(child):
+                    value = " ".join([x.text or "" for x in child if localname(x.tag) == "name"])
+                else:
+                    value = "".join(child.itertext()).strip()
+                register(obj, item, value)
+                break
+        return obj
+
+    def events(self):
+        for _event, elem in self.parser.read_events():
+            tag = localname(elem.tag)
+            if tag == "ttl":
+                try:
+                    self.ttl = int((elem.text or "").strip())
+                except ValueError:
+                    pass
+                continue
+            if tag not in ("item", "entry"):
+                continue
+            obj = self.element(elem)
+            self.order(elem)
+            elem.clear()
+            self.data = None
+            link = getattr(obj, "link", None)
+            if self.seen and link and self.seen(link):
+                self.insequence += 1
+                if self.newest and self.insequence >= self.stopafter:
+                    self.stopped = True
+                    return False
+                continue
+            self.insequence = 0
+            self.result.append(obj)
+        return True
+
+    def order(self, elem):
+        "newest is True while the dated items come newest first, False once they don't"
+        stamp = None
+        for child in elem:
+            if localname(child.tag) in ("pubDate", "updated", "published", "date"):
+                stamp = pubtime(child.text or "")
+                break
+        if stamp is None:
+            return
+        if self.previous is not None and self.newest is not False:
+            self.newest = stamp <= self.previous
+        self.previous = stamp
+
+    def feed(self, chunk):
+        if self.data is not None:
+            self.data += chunk
+        if self.failed:
+            return self.data is not None
+        try:
+            self.parser.feed(chunk)
+            return self.events()
+        except xml.etree.ElementTree.ParseError:
+            self.failed = True
+        return self.data is not None
+
+
 def getfeed(url, item):
     if Cfg.debug:
         print("debug enabled, not fetching.")
         return []
     try:
         result = geturl(url)
-    except (ValueError, HTTPError, URLError):
+    except (OSError, ValueError, http.client.HTTPException):
         return [Object(), Object()]
-    if not result:
+    if result.status >= 400:
         return [Object(), Object()]
-    return Parser.parse(str(result.data, "utf-8"), item)
+    return Parser.parse(str(result.data, "utf-8", "replace"), item)
+
+
+def gethints(result, stream):
+    hint = Object()
+    hint.maxage = 0
+    hint.retryafter = 0
+    hint.status = result.status
+    hint.ttl = stream.ttl
+    for directive in result.headers.get("cache-control", "").split(","):
+        key, _sep, value = directive.strip().partition("=")
+        if key.lower() == "max-age":
+            try:
+                hint.maxage = int(value)
+            except ValueError:
+                pass
+    if not hint.maxage and result.headers.get("expires"):
+        hint.maxage = max(0, int(httpdate(result.headers["expires"]) - time.time()))
+    retry = result.headers.get("retry-after", "")
+    if retry.isdigit():
+        hint.retryafter = int(retry)
+    elif retry:
+        hint.retryafter = max(0, int(httpdate(retry) - time.time()))
+    return hint
 
 
 def gettinyurl(url):
@@ -205,14 +728,88 @@ def gettinyurl(url):
     return []
 
 
-def geturl(url):
-    "http url fetcher."
-    url = urllib.parse.urlunparse(urllib.parse.urlparse(url))
-    req = urllib.request.Request(url)
-    req.add_header("User-agent", useragent("oirc"))
-    response = urllib.request.urlopen(req)
-    response.data = response.read()
-    return response
+def geturl(url, headers=None, timeout=None, redirects=5, consume=None):
+    "http url fetcher, reuses connections and follows redirects."
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme not in ("http", "https"):
+        raise ValueError("unsupported url %s" % url)
+    path = parsed.path or "/"
+    if parsed.query:
+        path += "?" + parsed.query
+    hdrs = {"User-agent": useragent("oirc"), "Accept-Encoding": "identity"}
+    hdrs.update(headers or {})
+    timeout = timeout or Fetcher.timeout
+    conn, reused = Connections.get(parsed.scheme, parsed.netloc, timeout)
+    while 1:
+        try:
+            conn.request("GET", path, headers=hdrs)
+            response = conn.getresponse()
+            break
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            if not reused:
+                raise
+            conn, reused = Connections.new(parsed.scheme, parsed.netloc, timeout), False
+    done = False
+    try:
+        if consume and response.status == 200:
+            data = b""
+            while 1:
+                chunk = response.read(Fetcher.chunksize)
+                if not chunk:
+                    done = True
+                    break
+                if not consume(chunk):
+                    break
+        else:
+            data = response.read()
+            done = True
+    finally:
+        if done and not response.will_close:
+            Connections.put(parsed.scheme, parsed.netloc, conn)
+        else:
+            conn.close()
+    location = response.getheader("location")
+    if response.status in (301, 302, 303, 307, 308) and location and redirects:
+        return geturl(urllib.parse.urljoin(url, location), headers, timeout, redirects-1, consume)
+    result = Object()
+    result.data = data
+    result.headers = {key.lower(): value for key, value in response.getheaders()}
+    result.reason = response.reason
+    result.status = response.status
+    result.url = url
+    return result
+
+
+def httpdate(txt):
+    try:
+        return email.utils.parsedate_to_datetime(txt).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def pubtime(txt):
+    "seconds since the epoch of a rfc 822 (rss) or iso 8601 (atom) date, None if it doesn't parse"
+    txt = txt.strip()
+    try:
+        return email.utils.parsedate_to_datetime(txt).timestamp()
+    except (TypeError, ValueError, IndexError):
+        pass
+    try:
+        return datetime.datetime.fromisoformat(txt.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def localname(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def normalize(link):
+    url = urllib.parse.urlparse(link)
+    if url.path and not url.path == "/":
+        return "%s://%s/%s" % (url.scheme, url.netloc, url.path)
+    return link
 
 
 def striphtml(text):
@@ -236,10 +833,12 @@ def dpl(event):
     setter = {"display_list": event.args[1]}
     names = Class.full("rss")
     if names:
-        feed = Db.last(names[0], {"rss": event.args[0]})
+        with Fetcher.lock:
+            feed = Db.last(names[0], {"rss": event.args[0]})
+            if feed:
+                edit(feed, setter)
+                save(feed)
         if feed:
-            edit(feed, setter)
-            save(feed)
             event.done()
 
 
@@ -262,11 +861,12 @@ def nme(event):
         return
     selector = {"rss": event.args[0]}
     got = []
-    for feed in  find("rss", selector):
-        feed.name = event.args[1]
-        got.append(feed)
-    for feed in got:
-        save(feed)
+    with Fetcher.lock:
+        for feed in  find("rss", selector):
+            feed.name = event.args[1]
+            got.append(feed)
+        for feed in got:
+            save(feed)
     event.done()
 
 
@@ -275,9 +875,10 @@ def rem(event):
         event.reply("rem <stringinurl>")
         return
     selector = {"rss": event.args[0]}
-    for feed in find("rss", selector):
-        feed.__deleted__ = True
-        save(feed)
+    with Fetcher.lock:
+        for feed in find("rss", selector):
+            feed.__deleted__ = True
+            save(feed)
     event.done()
 
 
@@ -287,7 +888,7 @@ def rss(event):
         for feed in find("rss"):
             event.reply("%s %s %s" % (
                                       nrs,
-                                      printable(feed),
+                                      printable(feed, skip="etag,modified"),
                                       elapsed(time.time() - fntime(feed.__fnm__)))
                                      )
             nrs += 1
@@ -307,3 +908,25 @@ def rss(event):
     feed.rss = event.args[0]
     save(feed)
     event.done()
+
+
+def sch(event):
+    now = time.time()
+    names = {feed.rss: feed.name for feed in find("rss")}
+    with Schedule.lock:
+        feeds = sorted(Schedule.feeds.items(), key=lambda x: x[1].due or now)
+    if not feeds:
+        event.reply("no feeds scheduled.")
+        return
+    for url, sch in feeds:
+        txt = "%s every %s next %s" % (
+                                       names.get(url) or url,
+                                       elapsed(sch.interval),
+                                       elapsed(max(0, sch.due - now)) if sch.due else "now"
+                                      )
+        if sch.fetched:
+            txt += " fetched %s ago" % elapsed(now - sch.fetched)
+        if sch.changed:
+            txt += " changed %s ago" % elapsed(now - sch.changed)
+        txt += " (%s)" % sch.reason
+        event.reply(txt)
@@ -0,0 +1,129 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116
+
+
+"storage"
+
+
+import time
+
+
+from cmdz import Cache, Class, Index, Object, Repeater, Wd
+from cmdz import compact, edit, items, last, save
+from cmdz.store import backends, migrate
+
+
+def __dir__():
+    return (
+            'Retention',
+            'cch',
+            'cmp',
+            'idx',
+            'init',
+            'mig',
+           )
+
+
+def init():
+    ret = Retention()
+    last(ret)
+    repeater = Repeater(float(ret.interval), retain)
+    repeater.start()
+    return repeater
+
+
+class Retention(Object):
+
+    def __init__(self):
+        super().__init__()
+        self.days = 0
+        self.grace = 30
+        self.interval = 3600
+        self.keep = 1
+
+
+Class.add(Retention)
+
+
+def retain(otype=None):
+    ret = Retention()
+    last(ret)
+    cutoff = None
+    if float(ret.days):
+        cutoff = time.time() - float(ret.days) * 24 * 60 * 60
+    grace = None
+    if float(ret.grace):
+        grace = float(ret.grace) * 24 * 60 * 60
+    res = []
+    for otp in Wd.types(otype):
+        nrs, purged = compact(otp, int(ret.keep), cutoff, grace)
+        res.append((otp, nrs, purged))
+    return res
+
+
+def cch(event):
+    if event.args and event.args[0] == "clear":
+        Cache.clear()
+        event.done()
+        return
+    event.reply(" ".join(["%s=%s" % (key, value) for key, value in items(Cache.stats())]))
+
+
+def cmp(event):
+    if event.sets:
+        ret = Retention()
+        last(ret)
+        edit(ret, event.sets)
+        save(ret)
+        event.done()
+        return
+    if not event.args:
+        ret = Retention()
+        last(ret)
+        event.reply(" ".join(["%s=%s" % (x, getattr(ret, x)) for x in ("keep", "days", "grace", "interval")]))
+        return
+    if event.args[0] != "run":
+        event.reply("cmp [run [type]] [keep=<n>] [days=<n>] [grace=<n>]")
+        return
+    for otp, nrs, purged in retain(event.args[1] if len(event.args) > 1 else None):
+        event.reply("%s %s revisions removed %s purged" % (otp, nrs, purged))
+
+
+def idx(event):
+    if not event.args:
+        res = []
+        for otp in Index.types():
+            res.append("%s/%s" % (otp.split(".")[-1].lower(), len(Index.get(otp))))
+        if res:
+            event.reply(" ".join(res))
+        else:
+            event.reply("no index yet.")
+        return
+    if event.args[0] not in ["rebuild", "verify"]:
+        event.reply("idx [rebuild|verify] [type]")
+        return
+    names = Wd.types(event.args[1] if len(event.args) > 1 else None)
+    for otp in names:
+        if event.args[0] == "rebuild":
+            Index.rebuild(otp)
+            event.reply("%s %s" % (otp, len(Index.get(otp))))
+            continue
+        res = Index.verify(otp)
+        if res:
+            event.reply("%s %s stale" % (otp, len(res)))
+        else:
+            event.reply("%s ok" % otp)
+
+
+def mig(event):
+    if not event.args or event.args[0] not in backends:
+        event.reply("mig <%s>" % "|".join(backends))
+        return
+    if event.args[0] == Wd.backend:
+        event.reply("already using %s" % Wd.backend)
+        return
+    dst = backends[event.args[0]](Wd.get())
+    nmr = migrate(Wd.store(), dst)
+    for otp in dst.types():
+        Index.rebuild(otp, dst)
+    event.reply("%s revisions migrated to %s" % (nmr, event.args[0]))
@@ -8,7 +8,7 @@
 import time
 
 
-from cmdz import Class, Object, elapsed, find, fntime, save
+from cmdz import Class, Object, elapsed, fntime, ifind, save
 
 
 def __dir__():
@@ -31,7 +31,7 @@ Class.add(Todo)
 def tdo(event):
     if not event.rest:
         nmr = 0
-        for obj in find("todo"):
+        for obj in ifind("todo"):
             event.reply("%s %s %s" % (
                                       nmr,
                                       obj.txt,
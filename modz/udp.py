@@ -5,11 +5,12 @@
 "udp to irc relay"
 
 
+import asyncio
 import socket
 import time
 
 
-from cmdz import Bus, Class, Object, last, launch
+from cmdz import Bus, Class, Loop, Object, last, launch
 
 
 def __dir__():
@@ -37,11 +38,26 @@ class Cfg(Object):
         self.port = 5500
 
 
+class Protocol(asyncio.DatagramProtocol):
+
+    def __init__(self, udp):
+        super().__init__()
+        self.udp = udp
+
+    def datagram_received(self, data, addr):
+        if self.udp.stopped:
+            return
+        txt = str(data.rstrip(), "utf-8", "replace")
+        if txt:
+            self.udp.output(txt)
+
+
 class UDP(Object):
 
     def __init__(self):
         super().__init__()
         self.stopped = False
+        self.transport = None
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
@@ -53,6 +69,18 @@ class UDP(Object):
     def output(txt):
         Bus.announce(txt.replace("\00", ""))
 
+    async def aserver(self):
+        try:
+            self._sock.bind((self.cfg.host, self.cfg.port))
+        except socket.gaierror:
+            return
+        self._sock.setblocking(False)
+        loop = asyncio.get_running_loop()
+        self.transport, _protocol = await loop.create_datagram_endpoint(
+                                                                       lambda: Protocol(self),
+                                                                       sock=self._sock
+                                                                      )
+
     def server(self):
         try:
             self._sock.bind((self.cfg.host, self.cfg.port))
@@ -69,12 +97,18 @@ class UDP(Object):
 
     def exit(self):
         self.stopped = True
+        if self.transport:
+            Loop.call(self.transport.close)
+            return
         self._sock.settimeout(0.01)
         self._sock.sendto(bytes("exit", "utf-8"), (self.cfg.host, self.cfg.port))
 
     def start(self):
         last(self.cfg)
-        launch(self.server)
+        if Loop.enabled:
+            Loop.submit(self.aserver())
+            return
+        launch(self.server, pooled=False)
 
 
 Class.add(Cfg)
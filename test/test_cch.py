@@ -0,0 +1,62 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116
+
+
+"cache"
+
+
+import os
+import unittest
+
+
+from cmdz.object import Cache, Object, Wd, hook, save
+
+
+Wd.workdir = ".test"
+
+
+class TestCache(unittest.TestCase):
+
+    def test_hit(self):
+        obj = Object()
+        obj.txt = "test"
+        fnm = save(obj)
+        hook(Wd.getpath(fnm))
+        hits = Cache.hits
+        oobj = hook(Wd.getpath(fnm))
+        self.assertEqual(oobj.txt, "test")
+        self.assertEqual(Cache.hits, hits + 1)
+
+    def test_copy(self):
+        obj = Object()
+        obj.lst = ["a"]
+        fnm = save(obj)
+        hook(Wd.getpath(fnm)).lst.append("b")
+        self.assertEqual(hook(Wd.getpath(fnm)).lst, ["a"])
+
+    def test_evict(self):
+        limit = Cache.limit
+        Cache.resize(1)
+        for _nr in range(2):
+            obj = Object()
+            hook(Wd.getpath(save(obj)))
+        self.assertEqual(len(Cache.objs), 1)
+        Cache.resize(limit)
+
+    def test_stale(self):
+        fnm = save(Object())
+        gen = Cache.generation(fnm)
+        Cache.remove(fnm)
+        Cache.put(fnm, {"txt": "stale"}, 10, gen)
+        self.assertEqual(Cache.get(fnm), None)
+
+    def test_workdir(self):
+        obj = Object()
+        obj.txt = "workdir"
+        fnm = save(obj)
+        hook(Wd.getpath(fnm))
+        Wd.workdir = os.path.join(".test", "other")
+        try:
+            self.assertFalse(hasattr(hook(Wd.getpath(fnm)), "txt"))
+        finally:
+            Wd.workdir = ".test"
@@ -0,0 +1,52 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116
+
+
+"compaction"
+
+
+import os
+import time
+import unittest
+
+
+from cmdz.object import Object, Wd, compact, fns, hook, save
+
+
+Wd.workdir = ".test"
+
+
+class Revision(Object):
+
+    pass
+
+
+class TestCompact(unittest.TestCase):
+
+    def test_keep(self):
+        obj = Revision()
+        fnms = []
+        for nmr in range(4):
+            obj.nmr = nmr
+            fnms.append(save(obj))
+        otp = fnms[0].split(os.sep)[0]
+        compact(otp, keep=2)
+        revs = [x for x in Wd.store().revisions(otp) if x.split(os.sep)[1] == fnms[0].split(os.sep)[1]]
+        self.assertEqual(revs, fnms[2:])
+        self.assertEqual(hook(Wd.getpath(fnms[-1])).nmr, 3)
+
+    def test_cutoff(self):
+        obj = Revision()
+        fnms = [save(obj), save(obj)]
+        otp = fnms[0].split(os.sep)[0]
+        compact(otp, keep=1, cutoff=time.time() - 3600)
+        self.assertTrue(fnms[0] in Wd.store().revisions(otp))
+
+    def test_purge(self):
+        obj = Revision()
+        obj.__deleted__ = True
+        fnm = save(obj)
+        otp = fnm.split(os.sep)[0]
+        compact(otp, grace=0)
+        self.assertFalse(fnm in Wd.store().revisions(otp))
+        self.assertFalse(Wd.getpath(fnm) in fns(otp))
@@ -5,10 +5,14 @@
 "event"
 
 
+import threading
+import time
 import unittest
 
 
-from cmdz.event import Event
+from cmdz.event import Event, Events, Parsed
+from cmdz.object import update
+from cmdz.run import Config
 
 
 class TestEvent(unittest.TestCase):
@@ -16,3 +20,80 @@ class TestEvent(unittest.TestCase):
     def testconstructor(self):
         evt = Event()
         self.assertEqual(type(evt), Event)
+
+    def test_ready(self):
+        evt = Event()
+        self.assertEqual(evt.__ready__, None)
+        evt.ready()
+        evt.wait()
+        self.assertEqual(evt.__ready__, None)
+
+    def test_wait(self):
+        evt = Event()
+        thr = threading.Thread(target=evt.wait)
+        thr.start()
+        time.sleep(0.01)
+        evt.ready()
+        thr.join(2.0)
+        self.assertFalse(thr.is_alive())
+
+    def test_slots(self):
+        evt = Event()
+        self.assertFalse("__ready__" in vars(evt))
+        self.assertFalse("__thr__" in vars(evt))
+
+    def test_lazy(self):
+        evt = Event()
+        self.assertFalse("sets" in vars(evt))
+        evt.parse("cmd key=value")
+        self.assertEqual(evt.sets.key, "value")
+        self.assertEqual(evt.gets.key, "")
+
+    def test_config(self):
+        cfg = Config()
+        prs = Parsed()
+        prs.parse("cmd -v")
+        update(cfg, prs)
+        self.assertEqual(cfg.sets.loop, "")
+        self.assertEqual(cfg.opts, "v")
+
+
+class TestEvents(unittest.TestCase):
+
+    def tearDown(self):
+        Events.size = 0
+        Events.free.clear()
+
+    def test_off(self):
+        evt = Event()
+        self.assertFalse(Events.put(evt))
+        self.assertFalse(Events.get() is evt)
+
+    def test_recycle(self):
+        Events.size = 2
+        evt = Event()
+        evt.txt = "cmd arg"
+        evt.channel = "#test"
+        evt.ready()
+        self.assertTrue(Events.put(evt))
+        new = Events.get()
+        self.assertTrue(new is evt)
+        self.assertEqual(new.txt, "")
+        self.assertEqual(new.channel, "")
+        self.assertFalse(new.__done__)
+
+    def test_error(self):
+        Events.size = 2
+        evt = Event()
+        evt.__exc__ = ValueError()
+        self.assertFalse(Events.put(evt))
+
+    def test_cap(self):
+        Events.size = 5
+        evts = [Event() for _nr in range(200)]
+        thrs = [threading.Thread(target=Events.put, args=(evt,)) for evt in evts]
+        for thr in thrs:
+            thr.start()
+        for thr in thrs:
+            thr.join()
+        self.assertEqual(len(Events.free[Event]), 5)
@@ -0,0 +1,44 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116
+
+
+"formats"
+
+
+import unittest
+
+
+from cmdz.object import Object, Wd, decode, encode, hook, save
+
+
+Wd.workdir = ".test"
+
+
+class TestFormat(unittest.TestCase):
+
+    def tearDown(self):
+        Wd.format = "json"
+
+    def test_formats(self):
+        for fmt in ("json", "compact", "zlib", "lzma", "marshal"):
+            Wd.format = fmt
+            obj = Object()
+            obj.txt = "format %s" % fmt
+            obj.lst = [1, 2, 3]
+            self.assertEqual(decode(encode(obj)), {"txt": "format %s" % fmt, "lst": [1, 2, 3]})
+
+    def test_mixed(self):
+        fnms = []
+        for fmt in ("json", "zlib", "marshal"):
+            Wd.format = fmt
+            obj = Object()
+            obj.txt = fmt
+            fnms.append(save(obj))
+        Wd.format = "json"
+        self.assertEqual([hook(Wd.getpath(x)).txt for x in fnms], ["json", "zlib", "marshal"])
+
+    def test_fallback(self):
+        Wd.format = "marshal"
+        obj = Object()
+        obj.sub = Object()
+        self.assertEqual(decode(encode(obj)), {"sub": {}})
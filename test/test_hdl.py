@@ -1,10 +1,11 @@
 # This file is placed in the Public Domain.
-# pylint: disable=C0114,C0115,C0116
+# pylint: disable=C0114,C0115,C0116,W0703
 
 
 "handler"
 
 
+import threading
 import unittest
 
 
@@ -16,3 +17,18 @@ class TestHandler(unittest.TestCase):
     def test_handler(self):
         hdl = Handler()
         self.assertEqual(type(hdl), Handler)
+
+    def test_stop(self):
+        hdl = Handler()
+        errors = []
+        def run():
+            try:
+                hdl.start()
+            except Exception as ex:
+                errors.append(ex)
+        thr = threading.Thread(target=run, daemon=True)
+        thr.start()
+        hdl.stop()
+        thr.join(2.0)
+        self.assertFalse(thr.is_alive())
+        self.assertEqual(errors, [])
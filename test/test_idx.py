@@ -0,0 +1,134 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116,W0212
+
+
+"index"
+
+
+import os
+import shutil
+import threading
+import unittest
+
+
+from cmdz.object import Class, Index, Object, Wd, batch, explain, find, fns, ifind, planstats, save, save_many
+
+
+Wd.workdir = ".test"
+
+
+class Item(Object):
+
+    pass
+
+
+Class.add(Item, index="txt")
+
+
+class TestIndex(unittest.TestCase):
+
+    def test_add(self):
+        obj = Object()
+        fnm = save(obj)
+        uid = fnm.split(os.sep)[1]
+        self.assertEqual(Index.get("cmdz.object.Object")[uid][1], fnm)
+
+    def test_latest(self):
+        obj = Object()
+        save(obj)
+        fnm = save(obj)
+        self.assertTrue(Wd.getpath(fnm) in fns("cmdz.object.Object"))
+
+    def test_rebuild(self):
+        obj = Object()
+        save(obj)
+        os.unlink(Index.path("cmdz.object.Object"))
+        self.assertTrue(Wd.getpath(obj.__fnm__) in fns("cmdz.object.Object"))
+
+    def test_verify(self):
+        obj = Object()
+        fnm = save(obj)
+        shutil.rmtree(os.path.dirname(os.path.dirname(Wd.getpath(fnm))))
+        self.assertTrue(fnm.split(os.sep)[1] in Index.verify("cmdz.object.Object"))
+        Index.rebuild("cmdz.object.Object")
+        self.assertEqual(Index.verify("cmdz.object.Object"), [])
+
+    def test_concurrent(self):
+        objs = [Object() for _nr in range(20)]
+        thrs = [threading.Thread(target=save, args=(obj,)) for obj in objs]
+        for thr in thrs:
+            thr.start()
+        for thr in thrs:
+            thr.join()
+        fnms = fns("cmdz.object.Object")
+        for obj in objs:
+            self.assertTrue(Wd.getpath(obj.__fnm__) in fnms)
+
+    def test_fields(self):
+        obj = Item()
+        obj.txt = "indexed"
+        fnm = save(obj)
+        flds = Index.get(fnm.split(os.sep)[0])[fnm.split(os.sep)[1]][2]
+        self.assertEqual(flds["txt"], "indexed")
+
+    def test_plan(self):
+        obj = Item()
+        obj.txt = "needle"
+        save(obj)
+        oobj = Item()
+        oobj.txt = "haystack"
+        save(oobj)
+        stats = explain("item", {"txt": "needle"})
+        self.assertEqual(stats.plan, "index")
+        self.assertTrue(stats.read < stats.files)
+        self.assertTrue(stats.matched >= 1)
+        self.assertTrue(find("item", {"txt": "needle"}))
+
+    def test_deleted(self):
+        obj = Item()
+        obj.txt = "deleted"
+        obj.__deleted__ = True
+        save(obj)
+        stats = explain("item", {"txt": "deleted"})
+        self.assertEqual(stats.matched, 0)
+        self.assertEqual(stats.read, 0)
+
+    def test_ifind(self):
+        for txt in ("one", "two", "three"):
+            obj = Item()
+            obj.txt = "stream%s" % txt
+            save(obj)
+        res = list(ifind("item", {"txt": "stream"}))
+        self.assertEqual([x.__fnm__ for x in res], [x.__fnm__ for x in find("item", {"txt": "stream"})])
+        res2 = list(ifind("item", {"txt": "stream"}, limit=1, offset=1))
+        self.assertEqual(res2[0].__fnm__, res[1].__fnm__)
+
+    def test_stats(self):
+        for txt in ("one", "two"):
+            obj = Item()
+            obj.txt = "counted%s" % txt
+            save(obj)
+        stats = planstats()
+        res = list(ifind("item", {"txt": "counted"}, stats=stats))
+        self.assertEqual(stats.matched, len(res))
+        self.assertEqual(stats.__dict__, explain("item", {"txt": "counted"}).__dict__)
+        stats = planstats()
+        list(ifind("item", {"txt": "counted"}, limit=1, stats=stats))
+        self.assertEqual(stats.read, 1)
+
+    def test_batch(self):
+        objs = [Item() for _nr in range(5)]
+        with batch():
+            for obj in objs:
+                obj.txt = "batched"
+                save(obj)
+            otp = objs[0].__fnm__.split(os.sep)[0]
+            self.assertFalse(Wd.getpath(objs[0].__fnm__) in fns(otp))
+        fnms = fns(otp)
+        for obj in objs:
+            self.assertTrue(Wd.getpath(obj.__fnm__) in fnms)
+
+    def test_save_many(self):
+        objs = [Item() for _nr in range(3)]
+        fnms = save_many(objs)
+        self.assertTrue(Wd.getpath(fnms[-1]) in fns(fnms[-1].split(os.sep)[0]))
@@ -0,0 +1,281 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116
+
+
+"irc"
+
+
+import time
+import unittest
+
+
+from cmdz.event import Event
+from cmdz.object import Wd, save
+from cmdz.loop import Loop
+from modz.irc import IRC, IEvent, Bucket, Config, Output, cfg, configs, init, parseline
+
+
+Wd.workdir = ".test"
+
+
+def command(txt):
+    evt = Event()
+    evt.parse(txt)
+    cfg(evt)
+    return evt
+
+
+class TestNetworks(unittest.TestCase):
+
+    def setUp(self):
+        for config in configs().values():
+            config.__deleted__ = True
+            save(config)
+
+    def test_configs(self):
+        command("cfg server=irc.example.org")
+        command("cfg network=oftc server=irc.oftc.net nick=bot")
+        cfgs = configs()
+        self.assertEqual(sorted(cfgs), ["", "oftc"])
+        self.assertEqual(cfgs["oftc"].server, "irc.oftc.net")
+        self.assertEqual(cfgs[""].server, "irc.example.org")
+
+    def test_edit(self):
+        command("cfg network=libera server=irc.libera.chat")
+        command("cfg network=libera nick=other")
+        cfgs = configs()
+        self.assertEqual(list(cfgs), ["libera"])
+        self.assertEqual(cfgs["libera"].server, "irc.libera.chat")
+        self.assertEqual(cfgs["libera"].nick, "other")
+
+    def test_show(self):
+        command("cfg network=oftc server=irc.oftc.net")
+        command("cfg network=libera server=irc.libera.chat")
+        evt = command("cfg")
+        self.assertEqual(len(evt.result), 2)
+
+    def test_init(self):
+        command("cfg network=oftc server=irc.oftc.net")
+        command("cfg network=libera server=irc.libera.chat")
+        start = IRC.start
+        IRC.start = lambda self: None
+        try:
+            bots = init()
+        finally:
+            IRC.start = start
+        self.assertEqual(len(bots), 2)
+        self.assertTrue(all(bot.aio for bot in bots))
+        self.assertFalse(Loop.enabled)
+
+    def test_dispatch(self):
+        bots = [Bot(Config()), Bot(Config())]
+        self.assertFalse(bots[0].cbs is bots[1].cbs)
+        for bot in bots:
+            self.assertTrue(bot.get("PRIVMSG").__self__ is bot)
+            self.assertTrue(bot.get("ERROR").__self__ is bot)
+        got = []
+        bots[0].privmsg = lambda event: got.append((0, event.txt))
+        bots[1].privmsg = lambda event: got.append((1, event.txt))
+        for nmr, bot in enumerate(bots):
+            bot.register("PRIVMSG", bot.privmsg)
+            evt = bot.event(":nick!user@host PRIVMSG #chan :network %s" % nmr)
+            bot.get("PRIVMSG")(evt)
+        self.assertEqual(got, [(0, "network 0"), (1, "network 1")])
+
+    def test_status(self):
+        config = Config()
+        config.network = "oftc"
+        bot = IRC(config)
+        self.assertTrue(bot.status().startswith("oftc"))
+        self.assertIn("disconnected", bot.status())
+
+
+class Bot(IRC):
+
+    def __init__(self, cfg=None):
+        IRC.__init__(self, cfg)
+        self.sent = []
+
+    def raw(self, txt):
+        self.sent.append(txt)
+
+
+class TestBucket(unittest.TestCase):
+
+    def test_burst(self):
+        bucket = Bucket(3, 10.0)
+        self.assertEqual([bucket.delay() for _x in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.delay(), 0.1, places=2)
+        self.assertAlmostEqual(bucket.delay(), 0.2, places=2)
+
+    def test_refill(self):
+        bucket = Bucket(1, 100.0)
+        bucket.delay()
+        time.sleep(0.02)
+        self.assertEqual(bucket.delay(), 0.0)
+
+    def test_limit(self):
+        bot = Bot()
+        bot.bucket = Bucket(2, 20.0)
+        starttime = time.time()
+        for nmr in range(4):
+            bot.command("PRIVMSG", "#test", str(nmr))
+        self.assertTrue(time.time() - starttime >= 0.09)
+        self.assertEqual(len(bot.sent), 4)
+        self.assertEqual(bot.bucket.stats()["sent"], 4)
+        self.assertTrue(bot.bucket.stats()["waited"] >= 0.09)
+
+    def test_priority(self):
+        bot = Bot()
+        bot.bucket = Bucket(1, 0.01)
+        bot.command("PRIVMSG", "#test", "first")
+        starttime = time.time()
+        bot.command("PONG", "server")
+        bot.command("CAP END")
+        self.assertTrue(time.time() - starttime < 0.5)
+        self.assertEqual(bot.sent[1:], ["PONG server", "CAP END"])
+
+
+class Out(Output):
+
+    def __init__(self):
+        Output.__init__(self)
+        self.said = []
+
+    def dosay(self, channel, txt):
+        self.said.append((channel, txt))
+
+
+class TestOutput(unittest.TestCase):
+
+    def test_roundrobin(self):
+        out = Out()
+        for nmr in range(3):
+            out.oput("#bulk", "bulk %s" % nmr)
+        out.oput("#chat", "reply")
+        self.assertEqual(out.pop(), ("#bulk", "bulk 0"))
+        self.assertEqual(out.pop(), ("#chat", "reply"))
+        self.assertEqual(out.pop(), ("#bulk", "bulk 1"))
+        self.assertEqual(out.pop(), ("#bulk", "bulk 2"))
+        self.assertEqual(out.pop(), None)
+
+    def test_spill(self):
+        out = Out()
+        out.maxpending = 2
+        for nmr in range(5):
+            out.oput("#bulk", "line %s" % nmr)
+        self.assertEqual(out.size("#bulk"), 3)
+        said = [out.pop()[1] for _x in range(3)]
+        self.assertEqual(said[:2], ["line 0", "line 1"])
+        self.assertTrue(said[2].startswith("3 more in cache"))
+        self.assertEqual(out.get("#bulk"), "line 2")
+
+    def test_output(self):
+        out = Out()
+        out.start()
+        out.oput("#chat", "hello")
+        for _x in range(100):
+            if out.said:
+                break
+            time.sleep(0.01)
+        out.stop()
+        self.assertEqual(out.said, [("#chat", "hello")])
+
+
+class Sock:
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def recv_into(self, buf):
+        if not self.chunks:
+            return 0
+        chunk = self.chunks.pop(0)
+        buf[:len(chunk)] = chunk
+        return len(chunk)
+
+
+class TestReader(unittest.TestCase):
+
+    def test_split(self):
+        data = ":a NOTICE b :caf\xe9\r\n:a NOTICE b :two\r\n".encode("utf-8")
+        bot = Bot()
+        bot.sock = Sock([data[:17], data[17:21], data[21:23], data[23:]])
+        bot.connected.set()
+        first = bot.poll()
+        second = bot.poll()
+        self.assertEqual(first.txt, "café")
+        self.assertEqual(second.txt, "two")
+        self.assertEqual(len(bot.rbuf), 0)
+
+    def test_nosock(self):
+        bot = Bot()
+        bot.connected.set()
+        self.assertRaises(ConnectionResetError, bot.some)
+
+    def test_burst(self):
+        lines = [":a PRIVMSG #c :line %s" % nmr for nmr in range(2000)]
+        data = ("\r\n".join(lines) + "\r\n").encode("utf-8")
+        bot = Bot()
+        bot.sock = Sock([data[x:x+bot.bufsize] for x in range(0, len(data), bot.bufsize)])
+        bot.connected.set()
+        bot.some()
+        self.assertEqual(bot.buffer[0], lines[0])
+        self.assertTrue(len(bot.buffer) > 1000)
+
+
+
+class TestParser(unittest.TestCase):
+
+    def test_privmsg(self):
+        msg = parseline(":nick!user@host PRIVMSG #chan :!cmd arg1 arg2")
+        self.assertEqual(msg.command, "PRIVMSG")
+        self.assertEqual(msg.nick, "nick")
+        self.assertEqual(msg.origin, "user@host")
+        self.assertEqual(msg.params, ["#chan"])
+        self.assertEqual(msg.txt, "!cmd arg1 arg2")
+
+    def test_ping(self):
+        msg = parseline("PING :irc.example.org")
+        self.assertEqual(msg.command, "PING")
+        self.assertEqual(msg.prefix, "")
+        self.assertEqual(msg.txt, "irc.example.org")
+
+    def test_notrailing(self):
+        msg = parseline(":server 366 nick #chan")
+        self.assertEqual(msg.origin, "server")
+        self.assertEqual(msg.params, ["nick", "#chan"])
+        self.assertEqual(msg.txt, "#chan")
+
+    def test_tags(self):
+        msg = parseline("@time=2023-01-01T00:00:00.000Z;msgid=a\\sb\\:c;+draft/x :n!u@h PRIVMSG #c :hi :)")
+        self.assertEqual(msg.tags["time"], "2023-01-01T00:00:00.000Z")
+        self.assertEqual(msg.tags["msgid"], "a b;c")
+        self.assertEqual(msg.tags["+draft/x"], "")
+        self.assertEqual(msg.command, "PRIVMSG")
+        self.assertEqual(msg.txt, "hi :)")
+
+    def test_ctcp(self):
+        msg = parseline(":n!u@h PRIVMSG bot :\001VERSION\001")
+        self.assertEqual(msg.txt, "VERSION")
+
+    def test_slots(self):
+        msg = parseline("PING :x")
+        self.assertFalse(hasattr(msg, "__dict__"))
+
+    def test_promote(self):
+        bot = Bot()
+        evt = bot.event(":nick!user@host PRIVMSG #chan :!cmd arg1 arg2")
+        self.assertEqual(type(evt), IEvent)
+        self.assertEqual(evt.channel, "#chan")
+        self.assertEqual(evt.args, ["arg1", "arg2"])
+        self.assertEqual(evt.type, "PRIVMSG")
+
+    def test_skip(self):
+        bot = Bot()
+        self.assertEqual(bot.event(":server 372 nick :- message of the day"), None)
+
+    def test_pong(self):
+        bot = Bot()
+        self.assertEqual(bot.event("PING :irc.example.org"), None)
+        self.assertEqual(bot.sent, ["PONG irc.example.org"])
@@ -0,0 +1,126 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116,W0212
+
+
+"loop"
+
+
+import asyncio
+import concurrent.futures
+import socket
+import threading
+import unittest
+
+
+from cmdz.event import Event
+from cmdz.handler import Handler
+from cmdz.loop import Loop
+from cmdz.thread import Timer
+from modz.irc import IRC
+from modz.udp import UDP
+
+
+class Collect(Handler):
+
+    def __init__(self):
+        Handler.__init__(self)
+        self.got = []
+        self.seen = threading.Event()
+
+    def announce(self, txt):
+        self.got.append(txt)
+        self.seen.set()
+
+    def handle(self, event):
+        self.got.append(event.txt)
+        self.seen.set()
+
+
+class TestLoop(unittest.TestCase):
+
+    def setUp(self):
+        Loop.enable()
+
+    def tearDown(self):
+        Loop.enabled = False
+
+    def test_later(self):
+        done = threading.Event()
+        Loop.later(0.01, done.set)
+        self.assertTrue(done.wait(2.0))
+
+    def test_timer(self):
+        done = threading.Event()
+        timer = Timer(0.01, done.set)
+        timer.start()
+        self.assertTrue(done.wait(2.0))
+
+    def test_cancel(self):
+        done = threading.Event()
+        timer = Timer(0.2, done.set)
+        timer.start()
+        timer.stop()
+        self.assertFalse(done.wait(0.4))
+
+    def test_handler(self):
+        hdl = Collect()
+        hdl.start()
+        evt = Event()
+        evt.txt = "hello"
+        hdl.put(evt)
+        self.assertTrue(hdl.seen.wait(2.0))
+        self.assertEqual(hdl.got, ["hello"])
+        hdl.stop()
+
+    def test_handlers(self):
+        hdls = [Collect() for _nr in range(40)]
+        for hdl in hdls:
+            hdl.start()
+        evt = Event()
+        evt.txt = "hello"
+        hdls[-1].put(evt)
+        self.assertTrue(hdls[-1].seen.wait(2.0))
+        for hdl in hdls:
+            hdl.stop()
+
+    def test_asay(self):
+        sent = []
+        bot = IRC()
+        bot.raw = sent.append
+        fut = Loop.submit(bot.asay("#chan", "hello"))
+        self.assertRaises(concurrent.futures.TimeoutError, fut.result, 0.1)
+        bot.event(":server 366 cmdz #chan :End of /NAMES list.")
+        fut.result(2.0)
+        self.assertEqual(sent, ["PRIVMSG #chan :hello"])
+
+    def test_irc(self):
+        lines = b":server 375 cmdz :motd\r\n:server NOTICE cmdz :motd\r\n:server NOTICE \xc3\xa9 :caf\xc3\xa9\r\n"
+        async def serve(reader, writer):
+            writer.write(lines)
+            await writer.drain()
+        async def connect():
+            srv = await asyncio.start_server(serve, "127.0.0.1", 0)
+            port = srv.sockets[0].getsockname()[1]
+            bot = IRC()
+            await bot.aconnect("127.0.0.1", port)
+            first = await bot.apoll()
+            second = await bot.apoll()
+            srv.close()
+            return first, second
+        first, second = Loop.submit(connect()).result(5.0)
+        self.assertEqual(first.command, "NOTICE")
+        self.assertEqual(second.txt, "café")
+
+    def test_udp(self):
+        col = Collect()
+        udp = UDP()
+        udp.output = col.announce
+        udp.cfg.port = 0
+        Loop.submit(udp.aserver()).result(2.0)
+        port = udp._sock.getsockname()[1]
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.sendto(b"relay", ("localhost", port))
+        sock.close()
+        self.assertTrue(col.seen.wait(2.0))
+        self.assertIn("relay", col.got)
+        udp.exit()
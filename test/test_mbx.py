@@ -0,0 +1,102 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116
+
+
+"mailbox"
+
+
+import mmap
+import os
+import sys
+import unittest
+
+
+from cmdz.event import Event
+from cmdz.object import Wd, find
+from cmdz.run import remote
+from modz.mbx import Importer, boundaries, cor, mbx, parsechunk
+
+
+Wd.workdir = ".test"
+
+
+MESSAGE = """From sender%s@example.org Mon Jan  2 10:00:00 2023
+From: sender%s@example.org
+Subject: message %s
+
+body of %s
+>From the quoted line
+"""
+
+
+def mbox(path, start, nrs):
+    with open(path, "a", encoding="utf-8") as file:
+        for nmr in range(start, start + nrs):
+            file.write(MESSAGE % (nmr, nmr, nmr, nmr) + "\n")
+
+
+class TestMbox(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.abspath(os.path.join(".test", "test.mbox"))
+        os.makedirs(".test", exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        if os.path.exists(Importer.cpath(self.path)):
+            os.unlink(Importer.cpath(self.path))
+
+    def test_boundaries(self):
+        data = b"junk\nFrom a\nx\n\nFrom b\ny\n"
+        self.assertEqual(list(boundaries(data)), [(5, 15), (15, len(data))])
+
+    def test_import(self):
+        mbox(self.path, 0, 10)
+        imp = Importer(self.path, 1)
+        self.assertEqual(imp.run(), 10)
+        res = find("email", {"Subject": "message 7"})
+        self.assertTrue(res)
+        self.assertIn("body of 7", res[-1].text)
+
+    def test_pool(self):
+        mbox(self.path, 0, 20)
+        imp = Importer(self.path, 2)
+        Importer.maxchunk = 3
+        try:
+            self.assertEqual(imp.run(), 20)
+        finally:
+            Importer.maxchunk = 500
+        self.assertEqual(imp.offset, os.path.getsize(self.path))
+
+    def test_resume(self):
+        mbox(self.path, 0, 5)
+        self.assertEqual(Importer(self.path, 1).run(), 5)
+        self.assertEqual(Importer(self.path, 1).run(), 0)
+        mbox(self.path, 5, 3)
+        self.assertEqual(Importer(self.path, 1).run(), 3)
+        self.assertEqual(Importer(self.path, 1).run(restart=True), 8)
+
+    def test_command(self):
+        mbox(self.path, 0, 4)
+        evt = Event()
+        evt.parse("mbx %s workers=1" % self.path)
+        mbx(evt)
+        self.assertEqual(evt.result[-1], "ok 4")
+
+    def test_cor(self):
+        mbox(self.path, 100, 2)
+        Importer(self.path, 1).run()
+        evt = Event()
+        evt.parse("cor sender101@example.org")
+        cor(evt)
+        self.assertTrue(evt.result)
+        self.assertIn("message 101", evt.result[-1])
+
+    def test_remote(self):
+        mbox(self.path, 0, 3)
+        with open(self.path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                ranges = list(boundaries(mapped))
+        path = sys.modules["modz.mbx"].__file__
+        res = remote(path, "parsechunk", self.path, ranges)
+        self.assertEqual(res, parsechunk(self.path, ranges))
+        self.assertIsNot(remote.mods[path], sys.modules["modz.mbx"])
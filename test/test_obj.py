@@ -281,6 +281,15 @@ class TestObject(unittest.TestCase):
         path = save(obj)
         self.assertTrue(os.path.exists(os.path.join(Wd.workdir, "store", path)))
 
+    def test_lazy(self):
+        obj = Default()
+        with self.assertRaises(AttributeError):
+            cmdz.object.Fnm.slot.__get__(obj, Default)
+        fnm = obj.__fnm__
+        self.assertTrue(fnm.startswith("cmdz.object.Default/"))
+        self.assertEqual(obj.__fnm__, fnm)
+        self.assertEqual(vars(obj), {})
+
     def test_update(self):
         obj = Object()
         obj.key = "value"
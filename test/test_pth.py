@@ -8,7 +8,7 @@
 import unittest
 
 
-from cmdz.object import fntime
+from cmdz.object import fnparse, fntime
 
 
 FN = "cmdz.handler.Event/45722f80dfec4867a1faf82bea059db0/2022-04-11/22:40:31.259218"
@@ -19,3 +19,10 @@ class TestPath(unittest.TestCase):
     def test_path(self):
         fnt = fntime(FN)
         self.assertEqual(fnt, 1649709631.259218)
+
+    def test_fast(self):
+        self.assertEqual(fntime(FN), fnparse(FN))
+
+    def test_nofraction(self):
+        fnm = FN.rsplit(".", 1)[0]
+        self.assertEqual(fntime(fnm), fnparse(fnm))
@@ -0,0 +1,424 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116,W0201
+
+
+"rss"
+
+
+import http.server
+import os
+import shutil
+import threading
+import time
+import unittest
+
+
+from cmdz.object import Object, Wd, find, save
+from modz.rss import Connections, Dedup, Fetcher, Rss, Schedule, Seen, Stream
+from modz.rss import gethints, geturl
+
+
+Wd.workdir = ".test"
+
+
+FEED = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>test</title>
+<item><title>one</title><link>http://localhost/one</link></item>
+<item><title>two</title><link>http://localhost/two</link></item>
+</channel></rss>
+"""
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    requests = []
+
+    def setup(self):
+        Handler.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        Handler.requests.append(self.path)
+        if self.path.startswith("/slow"):
+            time.sleep(0.5)
+        if self.path.startswith("/fail"):
+            self.reply(500, b"")
+            return
+        if self.path.startswith("/moved"):
+            self.send_response(301)
+            self.send_header("Location", "/feed")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.reply(200, bytes(FEED, "utf-8"), {"ETag": '"v1"'})
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, data, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class Server(http.server.ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class Fetch(Fetcher):
+
+    def __init__(self):
+        Fetcher.__init__(self)
+        self.said = []
+
+    def announce(self, txt):
+        self.said.append(txt)
+
+
+class TestFetcher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = "http://127.0.0.1:%s" % cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        Connections.clear()
+
+    def setUp(self):
+        Connections.clear()
+        Fetcher.errors.clear()
+        shutil.rmtree(os.path.join(Wd.workdir, "seen"), ignore_errors=True)
+        Dedup.clear()
+        Handler.connections = 0
+        Handler.requests = []
+
+    def feed(self, path):
+        feed = Rss()
+        feed.rss = self.url + path
+        return feed
+
+    def test_fetch(self):
+        fetcher = Fetch()
+        self.assertEqual(fetcher.fetch(self.feed("/feed")), 2)
+        self.assertEqual(len(fetcher.said), 2)
+        self.assertTrue(fetcher.said[0].startswith("two"))
+
+    def test_conditional(self):
+        fetcher = Fetch()
+        feed = self.feed("/feed?conditional")
+        fetcher.fetch(feed)
+        self.assertEqual(feed.etag, '"v1"')
+        said = len(fetcher.said)
+        shutil.rmtree(os.path.join(Wd.workdir, "seen"), ignore_errors=True)
+        Dedup.clear()
+        self.assertEqual(fetcher.fetch(feed), 0)
+        self.assertEqual(len(fetcher.said), said)
+        self.assertEqual(len(Handler.requests), 2)
+
+    def test_removed(self):
+        feed = self.feed("/feed?removed")
+        save(feed)
+        for rem in find("rss", {"rss": feed.rss}):
+            rem.__deleted__ = True
+            save(rem)
+        Fetch().fetch(feed)
+        self.assertEqual(find("rss", {"rss": feed.rss}), [])
+        self.assertEqual(feed.etag, '"v1"')
+
+    def test_concurrent(self):
+        feed = self.feed("/feed?concurrent")
+        save(feed)
+        with Fetcher.lock:
+            thr = threading.Thread(target=Fetcher.validators, args=(feed, '"v2"', ""))
+            thr.start()
+            for rem in find("rss", {"rss": feed.rss}):
+                rem.__deleted__ = True
+                save(rem)
+        thr.join()
+        self.assertEqual(find("rss", {"rss": feed.rss}), [])
+
+    def test_consume(self):
+        conns = []
+        new = Connections.new
+        def consume(_chunk):
+            raise RuntimeError("consume")
+        def record(*args):
+            conns.append(new(*args))
+            return conns[-1]
+        Connections.new = record
+        try:
+            with self.assertRaises(RuntimeError):
+                geturl(self.url + "/feed", consume=consume)
+        finally:
+            Connections.new = new
+        self.assertIsNone(conns[0].sock)
+        self.assertFalse(any(Connections.idle.values()))
+
+    def test_scheduled(self):
+        fetcher = Fetch()
+        feed = self.feed("/feed?scheduled")
+        save(feed)
+        Schedule.sync([feed.rss])
+        self.assertEqual(fetcher.scheduled(feed.rss), 2)
+        sch = Schedule.feeds[feed.rss]
+        self.assertEqual(sch.new, 2)
+        self.assertTrue(sch.due > time.time())
+        Schedule.feeds.clear()
+        Schedule.heap.clear()
+
+    def test_reuse(self):
+        for _x in range(3):
+            result = geturl(self.url + "/feed")
+            self.assertEqual(result.status, 200)
+        self.assertEqual(Handler.connections, 1)
+
+    def test_redirect(self):
+        result = geturl(self.url + "/moved")
+        self.assertEqual(result.status, 200)
+        self.assertEqual(Handler.requests, ["/moved", "/feed"])
+
+    def test_backoff(self):
+        fetcher = Fetch()
+        feed = self.feed("/fail")
+        self.assertEqual(fetcher.fetch(feed), 0)
+        failures, until, _txt = Fetcher.errors[feed.rss]
+        self.assertEqual(failures, 1)
+        self.assertTrue(until > time.time() + Fetcher.backoff - 5)
+        fetcher.fetch(feed)
+        failures, until, _txt = Fetcher.errors[feed.rss]
+        self.assertEqual(failures, 2)
+        self.assertTrue(until > time.time() + 2 * Fetcher.backoff - 5)
+
+    def test_timeout(self):
+        fetcher = Fetch()
+        feed = self.feed("/slow")
+        feed.timeout = 0.1
+        starttime = time.time()
+        self.assertEqual(fetcher.fetch(feed), 0)
+        self.assertTrue(time.time() - starttime < 0.5)
+        self.assertTrue(feed.rss in Fetcher.errors)
+
+
+class TestDedup(unittest.TestCase):
+
+    def setUp(self):
+        shutil.rmtree(os.path.join(Wd.workdir, "seen"), ignore_errors=True)
+        Dedup.clear()
+
+    def test_add(self):
+        self.assertEqual(Dedup.add("feed1", ["a", "b", "a"]), ["a", "b"])
+        self.assertEqual(Dedup.add("feed1", ["b", "c"]), ["c"])
+        self.assertEqual(Dedup.add("feed2", ["a"]), ["a"])
+
+    def test_persist(self):
+        Dedup.add("feed1", ["a", "b"])
+        Dedup.add("feed1", ["c"])
+        with open(Dedup.path("feed1"), encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 3)
+        Dedup.clear()
+        self.assertEqual(Dedup.add("feed1", ["a", "c", "d"]), ["d"])
+
+    def test_expire(self):
+        day = 24 * 60 * 60
+        path = Dedup.path("feed1")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("%s a\n%s b\n" % ((int(time.time() - (Dedup.days - 1) * day),) * 2))
+        self.assertEqual(Dedup.add("feed1", ["a"]), [])
+        Dedup.expire(time.time() + 2 * day)
+        Dedup.clear()
+        self.assertEqual(Dedup.add("feed1", ["a", "b"]), ["b"])
+
+    def test_refresh(self):
+        day = 24 * 60 * 60
+        Dedup.rewrite("legacy", {"old": int(time.time() - (Dedup.days - 1) * day)})
+        self.assertTrue(Dedup.has("feed1", "old"))
+        Dedup.expire(time.time() + 2 * day)
+        Dedup.clear()
+        self.assertTrue(Dedup.has("feed1", "old"))
+
+    def test_compact(self):
+        path = Dedup.path("feed1")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("1 old1\n2 old2\n3 old3\n%s new\n" % int(time.time()))
+        self.assertEqual(Dedup.add("feed1", ["new", "old1"]), ["old1"])
+        with open(path, encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+    def test_migrate(self):
+        seen = Seen()
+        seen.urls = ["http://old/one"]
+        save(seen)
+        self.assertEqual(Dedup.migrate(), 1)
+        self.assertEqual(Dedup.add("feed1", ["http://old/one", "http://new"]), ["http://new"])
+        self.assertEqual(Dedup.migrate(), 0)
+
+
+RDF = """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+ xmlns="http://purl.org/rss/1.0/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>rdf</title><link>http://localhost/</link></channel>
+<item><title>one</title><link>http://localhost/one</link><dc:creator>me</dc:creator></item>
+</rdf:RDF>
+"""
+
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>atom</title>
+<entry><title type="html">one &amp; two</title>
+<link rel="self" href="http://localhost/self"/>
+<link rel="alternate" href="http://localhost/one"/>
+<author><name>me</name></author></entry>
+</feed>
+"""
+
+
+def items(nrs, reverse=False, dated=True):
+    "items numbered nrs, item x dated x hours after 2023-01-02, listed newest first if reverse"
+    res = []
+    for nmr in nrs:
+        date = "<pubDate>Mon, 02 Jan 2023 %02d:00:00 GMT</pubDate>" % nmr if dated else ""
+        res.append("<item><title>%s</title><link>http://localhost/%s</link>%s</item>" % (nmr, nmr, date))
+    if reverse:
+        res.reverse()
+    return "".join(res)
+
+
+def parse(txt, items="title,link,author", seen=None, size=7):
+    stream = Stream(items, seen)
+    data = bytes(txt, "utf-8")
+    for pos in range(0, len(data), size):
+        if not stream.feed(data[pos:pos+size]):
+            break
+    return stream, stream.close()
+
+
+class TestStream(unittest.TestCase):
+
+    def test_rss(self):
+        _stream, res = parse(FEED)
+        self.assertEqual([x.title for x in res], ["one", "two"])
+        self.assertEqual(res[1].link, "http://localhost/two")
+
+    def test_rdf(self):
+        _stream, res = parse(RDF)
+        self.assertEqual(len(res), 1)
+        self.assertEqual(res[0].link, "http://localhost/one")
+        self.assertEqual(res[0].author, "me")
+
+    def test_atom(self):
+        _stream, res = parse(ATOM)
+        self.assertEqual(res[0].title, "one & two")
+        self.assertEqual(res[0].link, "http://localhost/one")
+        self.assertEqual(res[0].author, "me")
+
+    def test_stop(self):
+        txt = "<rss><channel>%s</channel></rss>" % items(range(10), reverse=True)
+        seen = ["http://localhost/%s" % x for x in range(8)]
+        stream, res = parse(txt, seen=lambda x: x in seen)
+        self.assertTrue(stream.stopped)
+        self.assertTrue(stream.newest)
+        self.assertEqual([x.title for x in res], ["9", "8"])
+
+    def test_oldest(self):
+        txt = "<rss><channel>%s</channel></rss>" % items(range(10))
+        seen = ["http://localhost/%s" % x for x in range(8)]
+        stream, res = parse(txt, seen=lambda x: x in seen)
+        self.assertFalse(stream.stopped)
+        self.assertFalse(stream.newest)
+        self.assertEqual([x.title for x in res], ["8", "9"])
+
+    def test_undated(self):
+        txt = "<rss><channel>%s</channel></rss>" % items(range(10), dated=False)
+        seen = ["http://localhost/%s" % x for x in range(8)]
+        stream, res = parse(txt, seen=lambda x: x in seen)
+        self.assertFalse(stream.stopped)
+        self.assertEqual([x.title for x in res], ["8", "9"])
+
+    def test_fallback(self):
+        stream, res = parse(FEED.replace("one", "one &nbsp; & more"))
+        self.assertTrue(stream.failed)
+        self.assertEqual(len(res), 2)
+        self.assertEqual(res[1].link, "http://localhost/two")
+
+
+    def test_unbuffered(self):
+        stream = Stream()
+        stream.feed(bytes(FEED[:FEED.index("<item>", FEED.index("</item>"))], "utf-8"))
+        self.assertEqual(stream.data, None)
+        self.assertFalse(stream.feed(b"<item><title>&nbsp;</title></item>"))
+        self.assertEqual([x.title for x in stream.close()], ["one"])
+
+
+class TestSchedule(unittest.TestCase):
+
+    def setUp(self):
+        Schedule.feeds.clear()
+        Schedule.heap.clear()
+
+    def test_spread(self):
+        now = time.time()
+        Schedule.sync(["feed%s" % x for x in range(100)], now)
+        dues = sorted([x.due for x in Schedule.feeds.values()])
+        self.assertTrue(dues[-1] - dues[0] > Schedule.interval / 2)
+        self.assertEqual(Schedule.due(now), [])
+        self.assertEqual(len(Schedule.due(now + Schedule.interval)), 100)
+
+    def test_adapt(self):
+        Schedule.sync(["feed"])
+        Schedule.due(time.time() + Schedule.interval)
+        sch = Schedule.done("feed", 3)
+        self.assertEqual(sch.interval, Schedule.interval / 2)
+        Schedule.due(sch.due)
+        sch = Schedule.done("feed", 0)
+        self.assertEqual(sch.interval, Schedule.interval * 0.75)
+        self.assertEqual(Schedule.due(sch.due - 1), [])
+        self.assertEqual(Schedule.due(sch.due), ["feed"])
+
+    def test_hints(self):
+        result = Object()
+        result.status = 200
+        result.headers = {"cache-control": "public, max-age=3600"}
+        stream = Stream()
+        stream.ttl = 90
+        hint = gethints(result, stream)
+        self.assertEqual(hint.maxage, 3600)
+        Schedule.sync(["feed"])
+        sch = Schedule.done("feed", 1, hint)
+        self.assertEqual(sch.interval, 90 * 60)
+        self.assertEqual(sch.reason, "ttl")
+
+    def test_retry(self):
+        result = Object()
+        result.status = 503
+        result.headers = {"retry-after": "7200"}
+        hint = gethints(result, Stream())
+        Schedule.sync(["feed"])
+        sch = Schedule.done("feed", 0, hint)
+        self.assertTrue(sch.due >= time.time() + 7100)
+        self.assertEqual(sch.reason, "retry-after")
+
+    def test_ttl(self):
+        stream = Stream()
+        stream.feed(bytes(FEED.replace("<title>test</title>", "<ttl>60</ttl>"), "utf-8"))
+        stream.close()
+        self.assertEqual(stream.ttl, 60)
@@ -0,0 +1,80 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116
+
+
+"segments"
+
+
+import os
+import shutil
+import unittest
+
+
+from cmdz.object import Object, Wd, find, fns, hook, save
+from cmdz.run import boot
+from cmdz.store import Segments
+
+
+Wd.workdir = ".test"
+
+
+class TestSegments(unittest.TestCase):
+
+    def setUp(self):
+        Wd.backend = "log"
+
+    def tearDown(self):
+        Wd.backend = "files"
+
+    def test_boot(self):
+        with self.assertRaises(SystemExit) as exc:
+            boot("store=logs")
+        self.assertIn("store=<files|log|sqlite>", str(exc.exception))
+        self.assertEqual(Wd.backend, "log")
+
+    def test_save(self):
+        obj = Object()
+        obj.txt = "segment"
+        fnm = save(obj)
+        self.assertFalse(os.path.exists(os.path.join(Wd.workdir, "store", fnm)))
+        self.assertEqual(hook(Wd.getpath(fnm)).txt, "segment")
+
+    def test_find(self):
+        obj = Object()
+        obj.txt = "segfind"
+        save(obj)
+        self.assertTrue([x for x in find("object") if x.__fnm__ == obj.__fnm__])
+
+    def test_compact(self):
+        store = Wd.store()
+        maxsize = Segments.maxsize
+        Segments.maxsize = 0
+        try:
+            obj = Object()
+            for nmr in range(5):
+                obj.nmr = nmr
+                save(obj)
+        finally:
+            Segments.maxsize = maxsize
+        self.assertEqual(store.compact("cmdz.object.Object"), 0)
+        self.assertEqual(hook(Wd.getpath(obj.__fnm__)).nmr, 4)
+        self.assertTrue(Wd.getpath(obj.__fnm__) in fns("cmdz.object.Object"))
+
+    def test_linear(self):
+        root = os.path.join(".test", "linear")
+        shutil.rmtree(root, ignore_errors=True)
+        store = Segments(root)
+        store.maxsize = 4096
+        written = []
+        append = store.append
+        def counted(otp, nr, records, sync=False):
+            written.extend([len(data) for _fnm, data in records])
+            append(otp, nr, records, sync)
+        store.append = counted
+        data = b"x" * 200
+        for rnd in range(4):
+            for nmr in range(300):
+                store.write("otp/%s/2023-01-01/00:00:%02d.%06d" % (nmr, rnd, nmr), data)
+        self.assertTrue(sum(written) < 3 * 1200 * len(data))
+        self.assertEqual(len(store.scan("otp")), 300)
+        self.assertEqual(store.read("otp/7/2023-01-01/00:00:03.000007"), data)
@@ -0,0 +1,88 @@
+# This file is placed in the Public Domain.
+# pylint: disable=C0115,C0116
+
+
+"sqlite"
+
+
+import sqlite3
+import unittest
+
+
+from cmdz.object import Object, Wd, find, fns, hook, last, save
+from cmdz.event import Event
+from cmdz.store import Sqlite, migrate
+from modz.sto import mig
+
+
+Wd.workdir = ".test"
+
+
+class TestSqlite(unittest.TestCase):
+
+    def setUp(self):
+        Wd.backend = "sqlite"
+
+    def tearDown(self):
+        Wd.backend = "files"
+
+    def test_save(self):
+        obj = Object()
+        obj.txt = "sqlite"
+        fnm = save(obj)
+        self.assertEqual(hook(Wd.getpath(fnm)).txt, "sqlite")
+        self.assertTrue("cmdz.object.Object" in Wd.types())
+
+    def test_revisions(self):
+        obj = Object()
+        obj.nmr = 1
+        first = save(obj)
+        obj.nmr = 2
+        second = save(obj)
+        self.assertTrue(Wd.getpath(second) in fns("cmdz.object.Object"))
+        self.assertFalse(Wd.getpath(first) in fns("cmdz.object.Object"))
+        self.assertEqual(hook(Wd.getpath(first)).nmr, 1)
+
+    def test_deleted(self):
+        obj = Object()
+        obj.txt = "sqldeleted"
+        obj.__deleted__ = True
+        save(obj)
+        self.assertFalse(find("object", {"txt": "sqldeleted"}))
+
+    def test_last(self):
+        obj = Object()
+        obj.txt = "sqllast"
+        save(obj)
+        oobj = Object()
+        last(oobj, {"txt": "sqllast"})
+        self.assertEqual(oobj.txt, "sqllast")
+
+    def test_migrate(self):
+        Wd.backend = "files"
+        obj = Object()
+        obj.txt = "migrated"
+        save(obj)
+        src = Wd.store()
+        Wd.backend = "sqlite"
+        self.assertTrue(migrate(src, Wd.store()))
+        self.assertEqual(hook(Wd.getpath(obj.__fnm__)).txt, "migrated")
+
+    def test_atomic(self):
+        store = Wd.store()
+        fnm = "cmdz.object.Object/atomic/2023-01-01/00:00:00.000001"
+        with self.assertRaises(sqlite3.Error):
+            store.write_many([(fnm, b"{}")], [([], fnm, None)])
+        self.assertEqual(store.read(fnm), None)
+
+    def test_mig(self):
+        Wd.backend = "files"
+        obj = Object()
+        obj.txt = "migcommand"
+        save(obj)
+        evt = Event()
+        evt.parse("mig sqlite")
+        mig(evt)
+        self.assertEqual(Wd.backend, "files")
+        uid = obj.__fnm__.split("/")[1]
+        self.assertEqual(Sqlite(Wd.get()).entries("cmdz.object.Object")[uid][1], obj.__fnm__)
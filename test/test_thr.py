@@ -8,7 +8,7 @@
 import unittest
 
 
-from cmdz.thread import Thread
+from cmdz.thread import Pool, Task, Thread, launch
 
 
 def test():
@@ -20,3 +20,25 @@ class TestThread(unittest.TestCase):
     def test_thread(self):
         thr = Thread(test, "test")
         self.assertEqual(type(thr), Thread)
+
+
+def add(aaa, bbb):
+    return aaa + bbb
+
+
+class TestPool(unittest.TestCase):
+
+    def test_launch(self):
+        task = launch(add, 1, 2)
+        self.assertEqual(task.join(), 3)
+
+    def test_bounded(self):
+        pool = Pool("test", 2)
+        tasks = [pool.put(Task(add, "add", nmr, 1)) for nmr in range(10)]
+        self.assertEqual([x.join() for x in tasks], list(range(1, 11)))
+        self.assertTrue(len(pool.workers) <= 2)
+
+    def test_unpooled(self):
+        thr = launch(add, 1, 2, pooled=False)
+        self.assertEqual(type(thr), Thread)
+        self.assertEqual(thr.join(), 3)